@@ -1,15 +1,27 @@
-from .question_generator import QuestionGeneratorAgent
-from .fact_questioning_agent import FactQuestioningAgent
-from .fact_checking_agent import FactCheckingAgent
-from .questioning_agent import QuestioningAgent
-from .base_agent import BaseAgent
-from .judge_agent import JudgeAgent
-
-__all__ = [
-    'QuestionGeneratorAgent',
-    'FactQuestioningAgent',
-    'FactCheckingAgent',
-    'QuestioningAgent',
-    'BaseAgent',
-    'JudgeAgent'
-] 
+import importlib
+
+# Agents are imported on first access (PEP 562) so that importing the package
+# doesn't pull in google.generativeai, aiohttp and tavily until they're needed
+_LAZY = {
+    'QuestionGeneratorAgent': '.question_generator',
+    'FactQuestioningAgent': '.fact_questioning_agent',
+    'FactCheckingAgent': '.fact_checking_agent',
+    'QuestioningAgent': '.questioning_agent',
+    'BaseAgent': '.base_agent',
+    'JudgeAgent': '.judge_agent',
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(_LAZY[name], __package__)
+    value = getattr(module, name)
+    globals()[name] = value  # Cache so later lookups bypass __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
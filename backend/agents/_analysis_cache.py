@@ -0,0 +1,204 @@
+"""
+Caches for fact-check analyses.
+SemanticCache stores L2-normalised question embeddings alongside the parsed
+analysis so that near-duplicate questions about the same content can skip search
+and LLM calls. AnalysisStore is an exact-match SQLite cache of the same analyses
+that survives restarts and is shared by every process using the same file.
+"""
+import asyncio
+import copy
+import hashlib
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+def content_fingerprint(content: str) -> str:
+    """Return a stable hash of the content being fact-checked"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class SemanticCache:
+    """Nearest-neighbour cache of analyses keyed by question embedding and content hash"""
+
+    def __init__(self, threshold: float = 0.97, max_entries: int = 1024, path: Optional[str] = None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.path = path
+        # Ring buffer of (max_entries, dim) normalised embeddings; the first len(self) rows
+        # are in use, and rows of the lists below line up with its rows
+        self._matrix: Optional[np.ndarray] = None
+        self._content_hashes: List[str] = []
+        self._analyses: List[Dict[str, Any]] = []
+        self._next = 0  # Row the next entry is written to, i.e. the oldest once full
+        self._dirty = False
+        self._write_lock = threading.Lock()  # asave() writes from worker threads
+        if path:
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._analyses)
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, embedding: Sequence[float], content_hash: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the closest cached analysis for the same content, if similar enough"""
+        if self._matrix is None or not self._analyses:
+            return None
+        query = self._normalize(embedding)
+        if query.shape[0] != self._matrix.shape[1]:
+            return None
+        scores = self._matrix[:len(self._analyses)] @ query
+        # Only entries computed against the same content are eligible
+        same_content = np.fromiter((h == content_hash for h in self._content_hashes), dtype=bool, count=len(self._content_hashes))
+        if not same_content.any():
+            return None
+        scores = np.where(same_content, scores, -1.0)
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        return copy.deepcopy(self._analyses[best])
+
+    def add(self, embedding: Sequence[float], content_hash: str, analysis: Dict[str, Any]) -> None:
+        """Store an analysis, overwriting the oldest entry when full"""
+        vector = self._normalize(embedding)
+        if self._matrix is None or self._matrix.shape[1] != vector.shape[0]:
+            # First entry, or the embedding model changed: start over
+            self._reset(vector.shape[0])
+        row = self._next
+        self._matrix[row] = vector
+        if row == len(self._analyses):
+            self._content_hashes.append(content_hash)
+            self._analyses.append(copy.deepcopy(analysis))
+        else:
+            self._content_hashes[row] = content_hash
+            self._analyses[row] = copy.deepcopy(analysis)
+        self._next = (row + 1) % self.max_entries
+        self._dirty = True
+
+    def _reset(self, dim: int) -> None:
+        self._matrix = np.empty((self.max_entries, dim), dtype=np.float32)
+        self._content_hashes = []
+        self._analyses = []
+        self._next = 0
+
+    def load(self) -> None:
+        """Load a previously saved cache from disk, ignoring missing or unreadable files"""
+        matrix_path, meta_path = f"{self.path}.npy", f"{self.path}.pkl"
+        if not (os.path.exists(matrix_path) and os.path.exists(meta_path)):
+            return
+        try:
+            matrix = np.load(matrix_path)
+            with open(meta_path, "rb") as f:
+                content_hashes, analyses = pickle.load(f)
+        except Exception as e:
+            logger.warning("Error loading semantic cache from %s: %s", self.path, e)
+            return
+        if len(matrix) == len(content_hashes) == len(analyses):
+            # Saved oldest first; keep the newest max_entries
+            matrix = matrix[-self.max_entries:]
+            self._reset(matrix.shape[1])
+            self._matrix[:len(matrix)] = matrix
+            self._content_hashes = list(content_hashes[-self.max_entries:])
+            self._analyses = list(analyses[-self.max_entries:])
+            self._next = len(matrix) % self.max_entries
+
+    def _snapshot(self) -> Optional[Tuple[np.ndarray, List[str], List[Dict[str, Any]]]]:
+        """Take the entries to persist, or None if there is nothing new to save"""
+        if not self.path or not self._dirty or self._matrix is None:
+            return None
+        self._dirty = False
+        # Copied oldest first, since add() overwrites buffer rows in place
+        size, oldest = len(self._analyses), self._next
+        if size < self.max_entries:
+            return self._matrix[:size].copy(), list(self._content_hashes), list(self._analyses)
+        return (
+            np.concatenate((self._matrix[oldest:], self._matrix[:oldest])),
+            self._content_hashes[oldest:] + self._content_hashes[:oldest],
+            self._analyses[oldest:] + self._analyses[:oldest],
+        )
+
+    def _write(self, matrix: np.ndarray, content_hashes: List[str], analyses: List[Dict[str, Any]]) -> None:
+        try:
+            with self._write_lock:
+                np.save(f"{self.path}.npy", matrix)
+                with open(f"{self.path}.pkl", "wb") as f:
+                    pickle.dump((content_hashes, analyses), f)
+        except Exception as e:
+            self._dirty = True
+            logger.warning("Error saving semantic cache to %s: %s", self.path, e)
+
+    def save(self) -> None:
+        """Persist the cache to disk if it changed since the last save"""
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            self._write(*snapshot)
+
+    async def asave(self) -> None:
+        """Like save(), but writes the files on a worker thread to keep the event loop free"""
+        # Snapshot on the loop thread, so entries added meanwhile can't tear the write
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            await asyncio.to_thread(self._write, *snapshot)
+
+
+class AnalysisStore:
+    """Persistent analyses keyed by normalised question text and content hash, with a TTL"""
+
+    def __init__(self, path: str, ttl: float = 86400.0):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()  # One connection, used from worker threads
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            # WAL lets other processes read while one writes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS analyses (key TEXT PRIMARY KEY, expiry REAL, value BLOB)"
+            )
+
+    @staticmethod
+    def _key(question_text: str, content_hash: str) -> str:
+        normalised = question_text.strip().lower()
+        return hashlib.sha256(f"{normalised}\0{content_hash}".encode("utf-8")).hexdigest()
+
+    def get(self, question_text: str, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Return the stored analysis for this question and content, unless missing or expired"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value FROM analyses WHERE key = ? AND expiry > ?",
+                    (self._key(question_text, content_hash), time.time())
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Error reading analysis store %s: %s", self.path, e)
+            return None
+        return orjson.loads(row[0]) if row else None
+
+    def put(self, question_text: str, content_hash: str, analysis: Dict[str, Any]) -> None:
+        """Store an analysis, replacing any previous one for the same key"""
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO analyses (key, expiry, value) VALUES (?, ?, ?)",
+                    (self._key(question_text, content_hash), time.time() + self.ttl, orjson.dumps(analysis))
+                )
+        except sqlite3.Error as e:
+            logger.warning("Error writing analysis store %s: %s", self.path, e)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,421 @@
+"""
+Parser for the structured analysis the fact-checking LLM writes.
+Kept separate from the agent and free of I/O so it can be pickled into worker
+processes and compiled with mypyc (mypyc backend/agents/_parse.py) without
+changes: every function is annotated and the tables are Final.
+"""
+import functools
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Final, List, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Section headers of the structured LLM analysis, e.g. "3. **Supporting Evidence:** ...",
+# found in one multiline scan; the remainder of a header line is captured as the start
+# of the section's content. Whitespace is matched as [^\S\n] so no match crosses lines
+_HEADER_RE: Final = re.compile(
+    r'^(?:[#*]|[^\S\n])*(?:\d[.)](?:\*|[^\S\n])*)?'
+    r'(?P<name>verification[^\S\n]*status|source[^\S\n]*evaluation|supporting[^\S\n]*evidence|'
+    r'contradicting[^\S\n]*evidence|reasoning|evidence[^\S\n]*gaps|recommendations?)'
+    r'(?:\*|[^\S\n])*:?(?:\*|[^\S\n])*(?P<tail>.*)$',
+    re.IGNORECASE | re.MULTILINE
+)
+# Header name (lowercased, whitespace removed) -> analysis key
+_SECTION_KEYS: Final = {
+    "verificationstatus": "verification_status",
+    "sourceevaluation": "source_evaluation",
+    "supportingevidence": "supporting_evidence",
+    "contradictingevidence": "contradicting_evidence",
+    "reasoning": "reasoning",
+    "evidencegaps": "evidence_gaps",
+    "recommendation": "recommendations",
+    "recommendations": "recommendations",
+}
+# Bullet or number marking the start of a list item (not a decimal such as "3.5")
+_BULLET_RE: Final = re.compile(r'^\s*(?:[-•*]|\d+[\.)](?!\d)|\s-\s)\s*')
+# Standardised verification status -> keywords that indicate it. First hit wins, so
+# statuses whose keywords contain another's ("partially true", "untrue", "unverified")
+# are checked before it
+_STATUS_KEYWORDS: Final = (
+    ("Partially True", ('partially true', 'partially', 'partly')),
+    ("Unable to Verify", ('unable to verify', 'unverified', 'insufficient', 'unclear')),
+    ("Unsubstantiated", ('unsubstantiated', 'unsupported')),
+    ("Misleading", ('misleading',)),
+    ("False", ('false', 'incorrect', 'untrue')),
+    ("Verified", ('verified', 'true', 'confirm')),
+)
+# All status keywords in one alternation (longest first, so "untrue" isn't read as
+# "true"), letting a single scan find every keyword; each maps to (priority, status)
+_KEYWORD_STATUS: Final = {
+    keyword: (priority, status)
+    for priority, (status, keywords) in enumerate(_STATUS_KEYWORDS)
+    for keyword in keywords
+}
+_STATUS_KEYWORD_RE: Final = re.compile("|".join(map(re.escape, sorted(_KEYWORD_STATUS, key=len, reverse=True))))
+# Which source verdicts a status's confidence is the share of: "no" for NO verdicts,
+# "evidence" for NO verdicts on evidence-seeking questions (neutral otherwise), and
+# YES verdicts for any other status
+_CONFIDENCE_BASIS: Final = {
+    "False": "no",
+    "Unsubstantiated": "evidence",
+    "Unable to Verify": "evidence",
+}
+# Default confidence per status when no source was evaluated
+_NO_EVALUATION_CONFIDENCE: Final = {
+    "Verified": 0.85,
+    "False": 0.85,  # High confidence for false claims too
+    "Partially True": 0.5,
+    "Misleading": 0.3,
+    "Unsubstantiated": 0.2,
+}
+# Verification status value following its header
+# (skipping markdown emphasis and a repeated header after "1.")
+_STATUS_VALUE_RE: Final = re.compile(
+    r'(?:1\.|[Vv]erification\s*[Ss]tatus:?)[\s*:]*(?:[Vv]erification\s*[Ss]tatus)?[\s*:]*"?([^"\n.*]+)"?'
+)
+# Start of the source evaluation section, and the supporting evidence header that ends it.
+# Start and end are searched separately: one lazy (.*?) pattern spanning them re-scans the
+# rest of the text from every "2." when no end follows, which is quadratic
+_SOURCE_EVAL_START_RE: Final = re.compile(r'2\.|[Ss]ource\s*[Ee]valuation:?')
+_SOURCE_EVAL_END_RE: Final = re.compile(r'3\.|[Ss]upporting\s*[Ee]vidence')
+# One "source: YES/NO - reason" line
+_SOURCE_EVAL_LINE_RE: Final = re.compile(r'[-•*]?\s*(.*?):\s*(YES|NO|yes|no|Yes|No)\s*-\s*(.*)')
+# Reasoning text when the line scan didn't find the section: from the reasoning header up to
+# the evidence gaps header or the end of the text
+_REASONING_START_RE: Final = re.compile(r'(?:5\.|[Rr]easoning:?)\s*')
+_REASONING_END_RE: Final = re.compile(r'6\.|[Ee]vidence\s*[Gg]aps')
+# Questions asking whether evidence for something exists at all
+_EVIDENCE_QUESTION_RE: Final = re.compile(
+    r'what evidence|is there evidence|is there any evidence|evidence.*exists|'
+    r'evidence.*support|origins of|source of|where.*come from'
+)
+
+# Echoed format definitions such as '- "Verified" - ...' or '- Format: ...'
+_FORMAT_DEF_RE: Final = re.compile(r'^[-•*](?:\s+".*?"\s*-|\s+[A-Z].*?:)')
+
+
+# JSON schema for Gemini structured output (response_mime_type="application/json"):
+# the same sections as the text format, with the status limited to the standard values.
+# There is no confidence field; confidence is scored from the YES/NO verdicts either way
+_STRING_LIST: Final = {"type": "array", "items": {"type": "string"}}
+ANALYSIS_SCHEMA: Final = {
+    "type": "object",
+    "properties": {
+        "verification_status": {"type": "string", "enum": [status for status, _ in _STATUS_KEYWORDS]},
+        "source_evaluations": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "source": {"type": "string"},
+                    "verdict": {"type": "string", "enum": ["YES", "NO"]},
+                    "reason": {"type": "string"},
+                },
+                "required": ["source", "verdict", "reason"],
+            },
+        },
+        "supporting_evidence": _STRING_LIST,
+        "contradicting_evidence": _STRING_LIST,
+        "reasoning": {"type": "string"},
+        "evidence_gaps": _STRING_LIST,
+        "recommendations": _STRING_LIST,
+    },
+    "required": ["verification_status", "source_evaluations", "reasoning"],
+}
+
+def _section_content(body: str, header_tail: str) -> str:
+    """Join the non-empty lines of a section body, after any content on the header line"""
+    section_lines = [header_tail] if header_tail else []
+    section_lines.extend(
+        line_strip for line_strip in map(str.strip, body.split("\n"))
+        if line_strip and not _FORMAT_DEF_RE.match(line_strip)
+    )
+    return "\n".join(section_lines).strip()
+
+
+def _text_between(start_re: re.Pattern[str], end_re: re.Pattern[str], text: str, to_end: bool = False) -> Optional[str]:
+    """Text after the first start_re match up to the next end_re match, in two linear scans
+
+    Without a following end_re match the rest of the text is returned if to_end is set,
+    otherwise None.
+    """
+    start = start_re.search(text)
+    if start is None:
+        return None
+    end = end_re.search(text, start.end())
+    if end is None:
+        return text[start.end():] if to_end else None
+    return text[start.end():end.start()]
+
+
+def _split_list_items(section_content: str) -> List[str]:
+    """Split a list section into items, joining wrapped continuation lines"""
+    items = []
+    item_buffer = ""
+    for item_line in section_content.split('\n'):
+        item_line = item_line.strip()
+        if not item_line:
+            continue
+        # Check if this line starts a new list item
+        bullet = _BULLET_RE.match(item_line)
+        if bullet:
+            if item_buffer:
+                items.append(item_buffer)
+            # Start new item buffer, slicing off the bullet/number already matched
+            item_buffer = item_line[bullet.end():].strip()
+        elif item_buffer:
+            item_buffer += " " + item_line
+        else:
+            item_buffer = item_line
+    if item_buffer:
+        items.append(item_buffer)
+    return items
+
+
+@functools.lru_cache(maxsize=1024)
+def _classify_status(raw_status: str) -> str:
+    """Map a free-text verification status to its standardised value
+
+    The model writes the same few status phrases over and over, so results are memoized.
+    """
+    matches = _STATUS_KEYWORD_RE.findall(raw_status.lower())
+    if matches:
+        # Several keywords may appear; the highest-priority status wins
+        return min(map(_KEYWORD_STATUS.__getitem__, matches))[1]
+    # If no match found, use the raw status with first letter capitalized
+    return raw_status.capitalize()
+
+
+def _score_confidence(status: str, yes_count: int, no_count: int, question_text: str) -> float:
+    """Confidence in a verification status, from the share of source verdicts backing it"""
+    total_sources = yes_count + no_count
+    if total_sources == 0:
+        # If no sources were evaluated, use a default based on verification status
+        return _NO_EVALUATION_CONFIDENCE.get(status, 0.5)
+    # Handle confidence calculation based on verification status AND question context
+    basis = _CONFIDENCE_BASIS.get(status)
+    # For "False" claims, NO responses contribute to confidence
+    if basis == "no":
+        return no_count / total_sources
+    # For "Unsubstantiated" claims, the interpretation depends on the question context
+    if basis == "evidence":
+        # If the question asks whether evidence exists and sources say NO (no evidence),
+        # that SUPPORTS the "Unsubstantiated" verdict with high confidence
+        if _EVIDENCE_QUESTION_RE.search(question_text.lower()) is not None:
+            logger.debug("[PARSE] Evidence-seeking question detected. NO answers support 'Unsubstantiated' verdict.")
+            return no_count / total_sources
+        return 0.5  # Neutral confidence for unclear cases
+    # For "Verified" and other positive claims, YES responses contribute to confidence
+    return yes_count / total_sources
+
+
+@dataclass(slots=True)
+class FactAnalysis:
+    """Fields of one analysis, filled in while parsing or built directly for placeholder results"""
+    verification_status: str = "Unknown"
+    confidence_score: Optional[float] = None  # Scored once the final status is known
+    supporting_evidence: List[str] = field(default_factory=list)
+    contradicting_evidence: List[str] = field(default_factory=list)
+    reasoning: str = ""
+    evidence_gaps: List[str] = field(default_factory=list)
+    recommendations: List[str] = field(default_factory=list)
+    sources: List[str] = field(default_factory=list)  # Sources will be added in _analyze_evidence
+    source_evaluations: List[Dict[str, str]] = field(default_factory=list)  # Track individual source evaluations
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The analysis as the plain dict the agents, caches and API pass around"""
+        return {
+            "verification_status": self.verification_status,
+            "confidence_score": self.confidence_score,
+            "supporting_evidence": self.supporting_evidence,
+            "contradicting_evidence": self.contradicting_evidence,
+            "reasoning": self.reasoning,
+            "evidence_gaps": self.evidence_gaps,
+            "recommendations": self.recommendations,
+            "sources": self.sources,
+            "source_evaluations": self.source_evaluations,
+        }
+
+
+def _finalize_section(analysis: FactAnalysis, section: str, section_content: str) -> None:
+    """Store a parsed section's content on the analysis"""
+    if section == "source_evaluation":
+        return  # Parsed separately, with YES/NO counting
+    if section == "verification_status":
+        # Keep the standardised status; the raw text only fills in when none was found
+        if analysis.verification_status == "Unknown" and section_content:
+            analysis.verification_status = _classify_status(section_content)
+    elif section == "reasoning":
+        analysis.reasoning = section_content
+    elif section == "supporting_evidence":
+        analysis.supporting_evidence = _split_list_items(section_content)
+    elif section == "contradicting_evidence":
+        analysis.contradicting_evidence = _split_list_items(section_content)
+    elif section == "evidence_gaps":
+        analysis.evidence_gaps = _split_list_items(section_content)
+    elif section == "recommendations":
+        analysis.recommendations = _split_list_items(section_content)
+
+
+def parse_analysis(text: str, question_text: str = "") -> Dict[str, Any]:
+    """Parse the model's analysis response with improved accuracy for verification status and reasoning"""
+    analysis = FactAnalysis()
+    current_section = None
+
+    # First, extract specific verification status using regex for better precision
+    # Try to find the verification status section with its value
+    verification_pattern = _STATUS_VALUE_RE.search(text)
+    if verification_pattern and verification_pattern.group(1).strip():
+        analysis.verification_status = _classify_status(verification_pattern.group(1).strip())
+
+    # Extract source evaluations and count YES/NO responses
+    source_eval_text = _text_between(_SOURCE_EVAL_START_RE, _SOURCE_EVAL_END_RE, text)
+    yes_count = 0
+    no_count = 0
+
+    if source_eval_text is not None:
+        source_evaluations = analysis.source_evaluations
+        source_lines = source_eval_text.strip().split('\n')
+        for line in source_lines:
+            line = line.strip()
+            if not line or line.startswith('-') and len(line) < 3:  # Skip empty lines or just bullet points
+                continue
+
+            # Extract source evaluations using regex
+            source_match = _SOURCE_EVAL_LINE_RE.search(line)
+            if source_match:
+                source = source_match.group(1).strip()
+                verdict = source_match.group(2).upper()
+                reason = source_match.group(3).strip()
+
+                source_evaluations.append({
+                    "source": source,
+                    "verdict": verdict,
+                    "reason": reason
+                })
+
+                if verdict == "YES":
+                    yes_count += 1
+                elif verdict == "NO":
+                    no_count += 1
+
+    # Find every section header in a single scan; each section's body is the text
+    # between the end of its header line and the start of the next header
+    header_tail = ""
+    body_start = 0
+    for header_match in _HEADER_RE.finditer(text):
+        if current_section:
+            _finalize_section(analysis, current_section, _section_content(text[body_start:header_match.start()], header_tail))
+        current_section = _SECTION_KEYS["".join(header_match.group("name").lower().split())]
+        # The header line itself may carry content after the colon
+        header_tail = header_match.group("tail").strip()
+        body_start = header_match.end()
+
+    # Process the last section
+    if current_section:
+        _finalize_section(analysis, current_section, _section_content(text[body_start:], header_tail))
+
+    # The status is final once the sections are parsed
+    status = analysis.verification_status
+
+    # Make sure reasoning is not empty
+    if not analysis.reasoning:
+        # Try to extract reasoning from the text if the section wasn't properly identified
+        reasoning_text = _text_between(_REASONING_START_RE, _REASONING_END_RE, text, to_end=True)
+        if reasoning_text is not None:
+            analysis.reasoning = reasoning_text.strip()
+        else:
+            # Create a simple reasoning based on verification status
+            analysis.reasoning = f"Based on the evidence, the claim is determined to be {status}."
+
+    confidence = analysis.confidence_score = _score_confidence(status, yes_count, no_count, question_text)
+
+    # Debug log the source evaluations
+    logger.debug("[PARSE] Found %s YES and %s NO evaluations from sources", yes_count, no_count)
+    logger.debug("[PARSE] Verification status: %s", status)
+
+    # Enhanced debugging for different question types (skipped entirely unless DEBUG is on)
+    if logger.isEnabledFor(logging.DEBUG):
+        basis = _CONFIDENCE_BASIS.get(status)
+        if basis == "no":
+            logger.debug("[PARSE] For FALSE claims, NO answers increase confidence: %.2f", confidence)
+        elif basis == "evidence":
+            # Check if we detected an evidence-seeking question
+            is_evidence_question = _EVIDENCE_QUESTION_RE.search(question_text.lower()) is not None
+
+            if is_evidence_question:
+                logger.debug("[PARSE] Evidence-seeking question detected: '%.50s...'", question_text)
+                logger.debug("[PARSE] For UNSUBSTANTIATED claims with evidence questions, NO answers increase confidence: %.2f", confidence)
+            else:
+                logger.debug("[PARSE] For UNSUBSTANTIATED claims (non-evidence questions), confidence is neutral: %.2f", confidence)
+        else:
+            logger.debug("[PARSE] For non-FALSE claims, YES answers increase confidence: %.2f", confidence)
+
+    logger.debug("[PARSE] Final confidence score: %s", confidence)
+
+    return analysis.to_dict()
+
+
+def _string_list(value: Any) -> List[str]:
+    """Non-empty strings of a JSON list field, tolerating a missing or malformed field"""
+    if not isinstance(value, list):
+        return []
+    return [item.strip() for item in value if isinstance(item, str) and item.strip()]
+
+
+def parse_structured_analysis(text: str, question_text: str = "") -> Dict[str, Any]:
+    """Read an analysis the model returned as JSON matching ANALYSIS_SCHEMA
+
+    Anything that isn't a JSON object (such as a text-format draft) goes through
+    parse_analysis instead.
+    """
+    try:
+        data = orjson.loads(text)
+    except orjson.JSONDecodeError:
+        data = None
+    if not isinstance(data, dict):
+        logger.debug("[PARSE] Response is not a JSON object, falling back to the text parser")
+        return parse_analysis(text, question_text)
+
+    analysis = FactAnalysis(
+        supporting_evidence=_string_list(data.get("supporting_evidence")),
+        contradicting_evidence=_string_list(data.get("contradicting_evidence")),
+        evidence_gaps=_string_list(data.get("evidence_gaps")),
+        recommendations=_string_list(data.get("recommendations")),
+    )
+    raw_status = data.get("verification_status")
+    if isinstance(raw_status, str) and raw_status.strip():
+        analysis.verification_status = _classify_status(raw_status.strip())
+
+    yes_count = 0
+    no_count = 0
+    evaluations = data.get("source_evaluations")
+    for evaluation in evaluations if isinstance(evaluations, list) else ():
+        if not isinstance(evaluation, dict):
+            continue
+        verdict = str(evaluation.get("verdict", "")).strip().upper()
+        if verdict not in ("YES", "NO"):
+            continue
+        analysis.source_evaluations.append({
+            "source": str(evaluation.get("source", "")).strip(),
+            "verdict": verdict,
+            "reason": str(evaluation.get("reason", "")).strip(),
+        })
+        if verdict == "YES":
+            yes_count += 1
+        else:
+            no_count += 1
+
+    status = analysis.verification_status
+    reasoning = data.get("reasoning")
+    analysis.reasoning = (
+        (reasoning.strip() if isinstance(reasoning, str) else "")
+        or f"Based on the evidence, the claim is determined to be {status}."
+    )
+    analysis.confidence_score = _score_confidence(status, yes_count, no_count, question_text)
+    logger.debug("[PARSE] Structured analysis: %s with %s YES and %s NO evaluations", status, yes_count, no_count)
+    return analysis.to_dict()
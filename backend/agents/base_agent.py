@@ -1,38 +1,56 @@
-import google.generativeai as genai
+import logging
 from typing import Dict, Any, List
 from ..utils.personality_loader import PersonalityLoader
+from ..utils.genai_client import get_genai_model
+
+logger = logging.getLogger(__name__)
 
 class BaseAgent:
     """Base class for all MARO framework agents"""
     
+    # Shared across instances: the pipelines construct several agents per request
+    personality_loader = PersonalityLoader()
+    _PERSONALITY_CACHE: Dict[str, Dict[str, Any]] = {}  # agent_type -> personality
+    _PROMPT_HEADER_CACHE: Dict[str, str] = {}  # agent_type -> formatted personality header
+    
     def __init__(self, config: Dict[str, Any], agent_type: str):
         self.config = config
         self.agent_type = agent_type
-        self.personality_loader = PersonalityLoader()
         self._load_personality()
         self._configure_gemini()
     
     def _configure_gemini(self):
-        """Configure the Gemini model"""
+        """Configure the Gemini model, reusing it across agents with the same API key"""
         try:
-            genai.configure(api_key=self.config["google_api_key"])
-            self.model = genai.GenerativeModel('gemini-1.5-pro')
-            print(f"Gemini configured successfully for {self.agent_type}")
+            self.model = get_genai_model(self.config["google_api_key"], 'gemini-1.5-pro')
+            logger.debug("Gemini configured successfully for %s", self.agent_type)
         except Exception as e:
-            print(f"Error configuring Gemini: {e}")
+            logger.error("Error configuring Gemini: %s", e)
             raise
     
     def _load_personality(self):
-        """Load agent personality"""
+        """Load agent personality, reading each YAML file only once per process"""
         try:
-            self.personality = self.personality_loader.load_personality(self.agent_type)
-            print(f"Loaded personality for {self.personality['name']}")
+            personality = BaseAgent._PERSONALITY_CACHE.get(self.agent_type)
+            if personality is None:
+                personality = self.personality_loader.load_personality(self.agent_type)
+                BaseAgent._PERSONALITY_CACHE[self.agent_type] = personality
+            self.personality = personality
+            logger.debug("Loaded personality for %s", self.personality['name'])
         except Exception as e:
-            print(f"Error loading personality: {e}")
+            logger.error("Error loading personality: %s", e)
             raise
     
     def _create_agent_prompt(self, task_prompt: str) -> str:
         """Create a prompt that incorporates the agent's personality"""
+        header = BaseAgent._PROMPT_HEADER_CACHE.get(self.agent_type)
+        if header is None:
+            header = self._build_prompt_header()
+            BaseAgent._PROMPT_HEADER_CACHE[self.agent_type] = header
+        return header + task_prompt
+
+    def _build_prompt_header(self) -> str:
+        """Format the personality part of the prompt; it never changes after loading"""
         return f"""You are {self.personality['name']}, the {self.personality['role']}.
 
 Your core traits are: {', '.join(self.personality['traits'])}
@@ -44,7 +62,7 @@ Follow this response structure:
 {' → '.join(self.personality['dialogue_structure'])}
 
 Task:
-{task_prompt}"""
+"""
 
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process input data - to be implemented by specific agents"""
@@ -1,257 +1,81 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple, Callable, Awaitable
+from collections import OrderedDict
 import aiohttp
-import json
+import orjson
 from .base_agent import BaseAgent
+from ._analysis_cache import SemanticCache, AnalysisStore, content_fingerprint
+from ._parse import ANALYSIS_SCHEMA, FactAnalysis, parse_analysis, parse_structured_analysis
 import asyncio
-# Import Tavily client
-from tavily import TavilyClient
+import copy
+import google.generativeai as genai
 import re
-import traceback
+import textwrap
+import html
+import hashlib
+import random
+import weakref
+import time
+import logging
+import os
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 # Use relative imports
-from ..utils import tavily_limiter, gemini_limiter
+from ..utils import tavily_limiter, gemini_limiter, ConcurrencyGate
 
-class FactCheckingAgent(BaseAgent):
-    """Agent that verifies factual accuracy using external sources"""
-    
-    def __init__(self, config: Dict[str, Any]):
-        super().__init__(config, "fact_checking")
-        # Get Tavily API key from config
-        self.tavily_api_key = config.get("tavily_api_key")
-        if not self.tavily_api_key:
-            raise ValueError("Tavily API key not found in configuration.")
-        # Initialize Tavily client
-        self.tavily_client = TavilyClient(api_key=self.tavily_api_key)
-        self.search_api_key = config.get("search_api_key")
-        self.wiki_api_endpoint = "https://en.wikipedia.org/w/api.php"
-    
-    async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Process input data through the fact checking pipeline"""
-        print("--- [PROCESS] Entering process method ---")
-        try:
-            questions = input_data.get("questions", [])
-            content = input_data.get("content", "")
-            metadata = input_data.get("metadata", {})
-            print(f"--- [PROCESS] Received {len(questions)} questions to process ---")
+logger = logging.getLogger(__name__)
 
-            fact_checks = []
+# Evidence text allowed in one analysis prompt, and per source at most
+_EVIDENCE_BUDGET = 8000
+_MAX_SOURCE_CHARS = 500
+# Tavily results requested at each search depth
+_WEB_MAX_RESULTS = {"basic": 3, "advanced": 5}
 
-            print("--- [PROCESS] Starting sequential processing of questions ---")
-            for i, question_dict in enumerate(questions):
-                print(f"--- [PROCESS] Processing question {i+1}/{len(questions)}: {question_dict.get('question', 'N/A')[:30]}... ---")
-                try:
-                    question_text = question_dict.get("question", "")
-                    if not question_text:
-                        print("--- [PROCESS] Skipping empty question dict ---")
-                        continue
-                    
-                    # Process each question sequentially to respect rate limits
-                    try:
-                        analysis_result = await self._analyze_evidence(question_dict, content)
-                        fact_checks.append({
-                            "question": question_dict,
-                            "analysis": analysis_result
-                        })
-                        
-                        # Add a mandatory pause between questions to ensure rate limits are respected
-                        if i < len(questions) - 1:  # Don't wait after the last question
-                            wait_time = 5.0  # 5 second pause between questions
-                            print(f"--- [PROCESS] Waiting {wait_time}s before processing next question ---")
-                            await asyncio.sleep(wait_time)
-                            
-                    except Exception as e:
-                        print(f"--- [PROCESS] Error analyzing evidence: {str(e)} ---")
-                        fact_checks.append({
-                            "question": question_dict,
-                            "analysis": {
-                                "verification_status": "error",
-                                "confidence_score": 0.0,
-                                "error": f"Error during analysis: {str(e)}",
-                                "supporting_evidence": [],
-                                "contradicting_evidence": [],
-                                "reasoning": f"Analysis failed: {str(e)}",
-                                "evidence_gaps": [],
-                                "recommendations": [],
-                                "sources": [],
-                                "source_evaluations": []
-                            }
-                        })
-                except Exception as e:
-                    # Handle immediate errors during task creation if any
-                    print(f"--- [PROCESS] EXCEPTION during processing for {question_dict.get('question', 'N/A')}: {e} ---")
-                    fact_checks.append({
-                        "question": question_dict,
-                        "analysis": {
-                            "verification_status": "error",
-                            "confidence_score": 0.0,
-                            "error": f"Error setting up analysis: {str(e)}",
-                            "supporting_evidence": [],
-                            "contradicting_evidence": [],
-                            "reasoning": f"Failed to process: {str(e)}",
-                            "evidence_gaps": [],
-                            "recommendations": [],
-                            "sources": [],
-                            "source_evaluations": []
-                        }
-                    })
-            print("--- [PROCESS] Finished processing all questions ---")
-
-            print("--- [PROCESS] Returning results ---")
-            return {
-                "fact_checks": fact_checks,
-                "metadata": metadata
-            }
-            
-        except Exception as e:
-            print(f"--- [PROCESS] FATAL EXCEPTION in process method: {e} ---")
-            return {
-                "error": str(e),
-                "fact_checks": []
-            }
-    
-    async def _search_web(self, question_text: str) -> List[Dict[str, Any]]:
-        """Search the web for evidence using Tavily API"""
-        print(f"--- [TAVILY:{question_text[:20]}...] Entering _search_web ---")
-        try:
-            # Tavily client search is synchronous, run in thread pool with rate limiting
-            loop = asyncio.get_running_loop()
-            print(f"--- [TAVILY:{question_text[:20]}...] Calling run_in_executor with rate limiting ---")
-            response = await loop.run_in_executor(
-                None, # Default executor (ThreadPoolExecutor)
-                lambda: tavily_limiter.execute_with_limit(
-                    self.tavily_client.search,
-                    query=question_text,
-                    search_depth="advanced", # Use advanced for more comprehensive results
-                    max_results=5 # Limit results
-                )
-            )
-            print(f"--- [TAVILY:{question_text[:20]}...] run_in_executor returned ---")
-            # Extract relevant info from Tavily results
-            results = response.get('results', [])
-            processed_results = [{"url": r.get('url'), "content": r.get('content')} for r in results]
-            print(f"--- [TAVILY:{question_text[:20]}...] Found {len(processed_results)} results ---")
-            return processed_results
-        except Exception as e:
-            print(f"--- [TAVILY:{question_text[:20]}...] EXCEPTION in _search_web: {e} ---")
-            return [] # Return empty list on error
-    
-    async def _search_wikipedia(self, question_text: str) -> List[Dict[str, Any]]:
-        """Search Wikipedia for relevant information based on question text"""
-        print(f"--- [WIKI:{question_text[:20]}...] Entering _search_wikipedia ---")
-        async with aiohttp.ClientSession() as session:
-            try:
-                # Use question text for search terms
-                search_terms = question_text
-
-                # Search Wikipedia API
-                params = {
-                    "action": "query", "format": "json", "list": "search",
-                    "srsearch": search_terms, "utf8": 1, "srlimit": 3
-                }
-                print(f"--- [WIKI:{question_text[:20]}...] Calling session.get with params: {params} ---")
-                async with session.get(self.wiki_api_endpoint, params=params) as response:
-                    print(f"--- [WIKI:{question_text[:20]}...] session.get returned status: {response.status} ---")
-                    if response.status == 200:
-                        print(f"--- [WIKI:{question_text[:20]}...] Reading response JSON ---")
-                        data = await response.json()
-                        print(f"--- [WIKI:{question_text[:20]}...] Processing results ---")
-                        processed_results = self._process_wiki_results(data)
-                        print(f"--- [WIKI:{question_text[:20]}...] Found {len(processed_results)} results ---")
-                        return processed_results
-                    else:
-                        print(f"--- [WIKI:{question_text[:20]}...] API error status: {response.status} ---")
-                        return []
-                        
-            except Exception as e:
-                print(f"--- [WIKI:{question_text[:20]}...] EXCEPTION in _search_wikipedia: {e} ---")
-                return []
-    
-    async def _analyze_evidence(self, question_dict: Dict[str, Any], content: str) -> Dict[str, Any]:
-        """Analyze the evidence for a specific question using search results"""
-        question_text = question_dict.get("question", "Unknown question")
-        print(f"--- [ANALYZE:{question_text[:20]}...] Entering _analyze_evidence ---")
-        try:
-            # 1. Gather evidence sequentially to respect rate limits
-            print(f"--- [ANALYZE:{question_text[:20]}...] Starting sequential search tasks ---")
-            
-            # Execute web search first
-            print(f"--- [ANALYZE:{question_text[:20]}...] Starting web search ---")
-            try:
-                web_results = await self._search_web(question_text)
-                web_error = None
-            except Exception as e:
-                web_results = []
-                web_error = e
-                print(f"--- [ANALYZE:{question_text[:20]}...] Web search resulted in error: {e} ---")
-            
-            # Then execute Wikipedia search
-            print(f"--- [ANALYZE:{question_text[:20]}...] Starting Wikipedia search ---")
-            try:
-                wiki_results = await self._search_wikipedia(question_text)
-                wiki_error = None
-            except Exception as e:
-                wiki_results = []
-                wiki_error = e
-                print(f"--- [ANALYZE:{question_text[:20]}...] Wiki search resulted in error: {e} ---")
-            
-            print(f"--- [ANALYZE:{question_text[:20]}...] Finished sequential search tasks ---")
-
-            # Handle potential errors from search tasks
-            web_evidence_str = "No web results found or error during search."
-            if isinstance(web_results, list):
-                 web_evidence_str = "\n".join([f"- {r.get('content', 'N/A')} (Source: {r.get('url', 'N/A')})" for r in web_results])
-            elif web_error:
-                 web_evidence_str = f"Error during web search: {web_error}"
-                 print(f"--- [ANALYZE:{question_text[:20]}...] Web search resulted in error: {web_error} ---")
-
-            wiki_evidence_str = "No Wikipedia results found or error during search."
-            if isinstance(wiki_results, list) and wiki_results:
-                 wiki_evidence_str = "\n".join([f"- {r.get('title', 'N/A')}: {r.get('snippet', 'N/A')}" for r in wiki_results])
-            elif wiki_error:
-                 wiki_evidence_str = f"Error during Wikipedia search: {wiki_error}"
-                 print(f"--- [ANALYZE:{question_text[:20]}...] Wiki search resulted in error: {wiki_error} ---")
-
-            # Create a summary from the evidence for easier analysis
-            evidence_summary = "Evidence Summary:\n"
-            
-            # First analyze web evidence
-            if isinstance(web_results, list) and web_results:
-                for i, result in enumerate(web_results[:3]):  # Focus on top 3 results
-                    content = result.get('content', '').strip()
-                    url = result.get('url', 'Unknown source')
-                    if content:
-                        evidence_summary += f"\nWeb Source #{i+1} ({url}):\n"
-                        evidence_summary += f"{content[:500]}...\n" if len(content) > 500 else f"{content}\n"
-                        evidence_summary += f"Key points: \n"
-                        # Extract 2-3 key points from this source
-                        evidence_summary += f"- The source discusses {question_text.lower()} with relevant information.\n"
-            
-            # Then analyze Wikipedia evidence
-            if isinstance(wiki_results, list) and wiki_results:
-                evidence_summary += "\nWikipedia Evidence:\n"
-                for i, result in enumerate(wiki_results[:2]):  # Focus on top 2 results
-                    title = result.get('title', 'Unknown topic')
-                    snippet = result.get('snippet', '').strip()
-                    if snippet:
-                        evidence_summary += f"- {title}: {snippet}\n"
 
-            # 2. Create the analysis prompt including search evidence with improved instructions
-            prompt = f"""You are an expert fact-checker tasked with determining the accuracy of claims based on evidence. Your goal is to provide a clear, well-reasoned verification that weighs all available evidence.
+def _shorten(text: Optional[str], width: int) -> str:
+    """Bound a search snippet at a word boundary so one verbose result can't dominate the prompt"""
+    return textwrap.shorten(text, width=width, placeholder="...") if text else ""
+
+
+def _source_width(source_count: int) -> int:
+    """Characters each evidence source may use so that all of them fit the prompt budget"""
+    return min(_MAX_SOURCE_CHARS, _EVIDENCE_BUDGET // max(source_count, 1))
+
 
-Original Content to Check:
-{content}
+# Headers for request bodies that are already serialised with orjson
+_JSON_HEADERS = {"Content-Type": "application/json"}
+# HTTP statuses worth retrying: throttling and transient server errors
+_SERVER_ERROR_STATUSES = (500, 502, 503, 504)
+_RETRY_STATUSES = (429,) + _SERVER_ERROR_STATUSES
 
-Specific Claim/Question to Verify:
-{question_text}
 
-{evidence_summary}
+def _retry_after_seconds(headers: Any) -> Optional[float]:
+    """Read a numeric Retry-After header, if the server sent one"""
+    value = headers.get("Retry-After") if headers else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None  # HTTP-date form; fall back to backoff
 
-Full Web Search Evidence:
-{web_evidence_str}
+# Markup in Wikipedia search snippets (searchmatch spans and anything else)
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
 
-Full Wikipedia Evidence:
-{wiki_evidence_str}
+# Letters and digits of a query; punctuation and whitespace only separate words
+_QUERY_WORD_RE = re.compile(r"[^\W_]+")
 
-INSTRUCTIONS FOR ANALYSIS:
+
+def _canonical_query(query: str) -> str:
+    """Normalise case, whitespace and punctuation so only identical queries share one search.
+    No words are dropped: "Who founded X?" and "When was X founded?" need different evidence"""
+    return " ".join(_QUERY_WORD_RE.findall(query.lower())) or query.strip().lower()
+
+# Static parts of the evidence-analysis prompt, kept out of the per-question build
+_ANALYSIS_PREAMBLE = (
+    "You are an expert fact-checker tasked with determining the accuracy of claims based on evidence. "
+    "Your goal is to provide a clear, well-reasoned verification that weighs all available evidence.\n\n"
+)
+
+_ANALYSIS_INSTRUCTIONS = """INSTRUCTIONS FOR ANALYSIS:
 1. First, identify the specific factual assertions in the claim that need verification.
 2. Carefully evaluate each piece of evidence for its relevance, credibility, and relationship to the claim.
 3. Focus on factual accuracy only, not opinions or subjective interpretations.
@@ -309,81 +133,817 @@ INSTRUCTIONS FOR ANALYSIS:
 Answer ONLY with the structured analysis exactly as outlined above, with numbered headings.
 """
 
-            # 3. Get the model's response
-            if not hasattr(self, 'model') or self.model is None:
-                 print(f"--- [ANALYZE:{question_text[:20]}...] ERROR: Generative model not initialized. ---")
-                 raise ValueError("Generative model not available for analysis.")
+# With structured output the model fills ANALYSIS_SCHEMA instead of writing numbered headings
+_STRUCTURED_ANALYSIS_INSTRUCTIONS = _ANALYSIS_INSTRUCTIONS.replace(
+    "Answer ONLY with the structured analysis exactly as outlined above, with numbered headings.",
+    "Answer ONLY with a JSON object holding the sections outlined above as its fields."
+)
+_STRUCTURED_GENERATION_CONFIG = {"response_mime_type": "application/json", "response_schema": ANALYSIS_SCHEMA}
+
+class FactCheckingAgent(BaseAgent):
+    """Agent that verifies factual accuracy using external sources"""
+    
+    # Shared across instances since the pipelines build a new agent per request
+    _semantic_cache: Optional[SemanticCache] = None
+    # Persistent exact-match analyses, enabled by setting "analysis_cache_path"
+    _analysis_store: Optional[AnalysisStore] = None
+    # One pooled HTTP session per event loop, reused by every agent on that loop, and how
+    # many agents on each loop are using it (until their aclose())
+    _sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = weakref.WeakKeyDictionary()
+    _session_users: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, int]" = weakref.WeakKeyDictionary()
+    # Set by long-running hosts (the API server) that close the session themselves on shutdown
+    _retain_shared_session: bool = False
+    # Search results by normalised question hash -> (monotonic timestamp, results)
+    _web_cache: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+    _wiki_cache: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+    # Searches currently running, so concurrent callers for the same question share one request
+    _inflight: Dict[str, asyncio.Future] = {}
+    # Per-API concurrency/pacing gates, shared by all agents on the same event loop
+    _gates: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, ConcurrencyGate]]" = weakref.WeakKeyDictionary()
+    # Worker processes for parsing LLM responses of large batches, created on first use
+    _parse_pool: Optional[ProcessPoolExecutor] = None
+    # Worker processes that each run a shard of a very large batch on their own loop
+    _shard_pool: Optional[ProcessPoolExecutor] = None
+    
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config, "fact_checking")
+        # Get Tavily API key from config
+        self.tavily_api_key = config.get("tavily_api_key")
+        if not self.tavily_api_key:
+            raise ValueError("Tavily API key not found in configuration.")
+        # Tavily is called over HTTP on the shared session rather than through the blocking SDK
+        self.tavily_api_endpoint = "https://api.tavily.com/search"
+        # The key goes in the Authorization header, as the Tavily SDK sends it, not in the body
+        self._tavily_headers = {**_JSON_HEADERS, "Authorization": f"Bearer {self.tavily_api_key}"}
+        self.search_api_key = config.get("search_api_key")
+        self.wiki_api_endpoint = "https://en.wikipedia.org/w/api.php"
+        # Loop-bound resources (semaphores), created lazily on the running loop
+        self.analysis_concurrency = config.get("analysis_concurrency", 8)
+        # Opt-in: draft each analysis from the content alone while the searches run
+        self.speculative_draft = config.get("speculative_draft", False)
+        # Caps on simultaneous search and LLM calls and their request rate, across all agents.
+        # APILimiter's delay check doesn't reserve a slot, so concurrent callers can pass it
+        # together; the gates enforce the limiters' spacing by default instead
+        self.gate_limits = {
+            "tavily": (config.get("tavily_max_concurrent", 8), config.get("tavily_rps", 1.0 / tavily_limiter.base_delay)),
+            "wiki": (config.get("wiki_max_concurrent", 16), config.get("wiki_rps", 20)),
+            "llm": (config.get("llm_max_concurrent", 10), config.get("llm_rps", 1.0 / gemini_limiter.base_delay)),
+        }
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None  # Loop whose session this agent counts as using
+        self._analysis_sem: Optional[asyncio.Semaphore] = None
+        # Opt-in: semantic cache of previous analyses. Each lookup costs an embedding call, and
+        # questions above the similarity threshold share a verdict. The default is kept high,
+        # but questions differing only in a number or date (e.g. "founded in 1998?" vs "1999?")
+        # can still score above it, so only enable this where such near-duplicates are rare
+        self.embedding_model = config.get("embedding_model", "models/text-embedding-004")
+        if config.get("semantic_cache", False) and FactCheckingAgent._semantic_cache is None:
+            FactCheckingAgent._semantic_cache = SemanticCache(
+                threshold=config.get("semantic_cache_threshold", 0.97),
+                max_entries=config.get("semantic_cache_size", 1024),
+                path=config.get("semantic_cache_path")
+            )
+        self.semantic_cache = FactCheckingAgent._semantic_cache if config.get("semantic_cache", False) else None
+        analysis_cache_path = config.get("analysis_cache_path")
+        if analysis_cache_path and FactCheckingAgent._analysis_store is None:
+            FactCheckingAgent._analysis_store = AnalysisStore(
+                analysis_cache_path,
+                ttl=config.get("analysis_cache_ttl", 86400.0)
+            )
+        self.analysis_store = FactCheckingAgent._analysis_store if analysis_cache_path else None
+        # Limits for the shared exact-match LRU caches of search responses
+        self.search_cache_size = config.get("search_cache_size", 1000)
+        self.search_cache_ttl = config.get("search_cache_ttl", 3600.0)
+        # Opt-in: search Tavily at basic depth first, and only re-search at advanced depth
+        # (and re-analyze) when the first analysis is "Unable to Verify"
+        self.adaptive_search = config.get("adaptive_search", False)
+        # Opt-in: have Gemini return the analysis as JSON (ANALYSIS_SCHEMA) instead of text
+        self.structured_output = config.get("structured_output", False)
+        # Opt-in: batches of at least this many analyses parse the LLM responses in worker
+        # processes. Off by default, since a pool round trip costs more than parsing inline
+        self.parse_pool_threshold = config.get("parse_pool_threshold", math.inf)
+        self.parse_workers = config.get("parse_workers", os.cpu_count())
+        self._offload_parse = False
+        # Opt-in: split batches of at least shard_threshold questions across process_shards processes
+        self.process_shards = config.get("process_shards", 1)
+        self.shard_threshold = config.get("shard_threshold", 64)
+    
+    @staticmethod
+    def _search_cache_key(question_text: str) -> str:
+        """Key search caches by the normalised question so case and padding don't matter"""
+        return hashlib.sha1(question_text.strip().lower().encode("utf-8")).hexdigest()
+    
+    def _cache_get(self, cache: OrderedDict, question_text: str) -> Optional[List[Dict[str, Any]]]:
+        """Return a fresh cached search result, dropping it if expired"""
+        key = self._search_cache_key(question_text)
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        timestamp, results = entry
+        if time.monotonic() - timestamp >= self.search_cache_ttl:
+            del cache[key]
+            return None
+        cache.move_to_end(key)
+        return results
+    
+    def _cache_put(self, cache: OrderedDict, question_text: str, results: List[Dict[str, Any]]) -> None:
+        """Store a search result, evicting the least recently used entry on overflow"""
+        key = self._search_cache_key(question_text)
+        cache[key] = (time.monotonic(), results)
+        cache.move_to_end(key)
+        while len(cache) > self.search_cache_size:
+            cache.popitem(last=False)
+    
+    def _bind_loop(self) -> None:
+        """Reset loop-bound resources when the agent is driven from a new event loop"""
+        loop = asyncio.get_running_loop()
+        # Semaphores are bound to the loop they were created on; tools that run the
+        # agent on a fresh loop per call get fresh ones instead of dead ones
+        if self._loop is not loop:
+            self._loop = loop
+            self._analysis_sem = asyncio.Semaphore(self.analysis_concurrency)
+    
+    def _gate(self, name: str) -> ConcurrencyGate:
+        """Return the running loop's shared gate for an API, creating it on first use"""
+        gates = FactCheckingAgent._gates.setdefault(asyncio.get_running_loop(), {})
+        gate = gates.get(name)
+        if gate is None:
+            max_concurrent, rps = self.gate_limits[name]
+            gate = gates[name] = ConcurrencyGate(name, max_concurrent=max_concurrent, rps=rps)
+        return gate
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the session shared by all agents on this loop, creating it on first use"""
+        self._bind_loop()
+        cls = FactCheckingAgent
+        loop = self._loop
+        if self._session_loop is not loop:
+            # Moved to a new loop (tools run one per call): stop using the old loop's session
+            self._release_session()
+            cls._session_users[loop] = cls._session_users.get(loop, 0) + 1
+            self._session_loop = loop
+        session = cls._sessions.get(loop)
+        if session is None or session.closed:
+            # Keep-alive connections and cached DNS survive across requests and agents;
+            # connections left half-closed by a TLS peer are reaped rather than leaked
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=100, limit_per_host=10, ttl_dns_cache=300, enable_cleanup_closed=True
+                ),
+                # Fail fast on an unreachable host instead of spending the whole budget connecting
+                timeout=aiohttp.ClientTimeout(total=15, connect=3)
+            )
+            cls._sessions[loop] = session
+        return session
+    
+    def _release_session(self) -> bool:
+        """Stop counting this agent as a user of its loop's session; True if it was the last user"""
+        cls = FactCheckingAgent
+        loop = self._session_loop
+        if loop is None:
+            return False
+        self._session_loop = None
+        users = cls._session_users.get(loop, 1) - 1
+        if users > 0:
+            cls._session_users[loop] = users
+            return False
+        cls._session_users.pop(loop, None)
+        return True
+    
+    @classmethod
+    def retain_shared_session(cls) -> None:
+        """Keep the pooled session open across aclose(); the caller closes it with close_shared_session()"""
+        cls._retain_shared_session = True
+    
+    @classmethod
+    async def close_shared_session(cls) -> None:
+        """Close the running loop's shared HTTP session; call on shutdown or before closing the loop"""
+        session = cls._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+    
+    @classmethod
+    def shutdown_worker_pools(cls) -> None:
+        """Stop the parse and shard worker processes, if any were started; call on shutdown"""
+        pools = (cls._parse_pool, cls._shard_pool)
+        cls._parse_pool = None
+        cls._shard_pool = None
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+    
+    async def _parse_response(self, text: str, question_text: str, structured: bool = False) -> Dict[str, Any]:
+        """Parse an LLM response, in a worker process when the current batch is large"""
+        parse = parse_structured_analysis if structured else parse_analysis
+        if not self._offload_parse:
+            return parse(text, question_text)
+        cls = FactCheckingAgent
+        if cls._parse_pool is None:
+            # Spawned rather than forked: this process has threads (and their locks) running
+            cls._parse_pool = ProcessPoolExecutor(
+                max_workers=self.parse_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(cls._parse_pool, parse, text, question_text)
+    
+    async def aclose(self) -> None:
+        """Persist the semantic cache and, unless a host retains it, close the pooled HTTP session
+        once no other agent on this loop is using it"""
+        if self.semantic_cache is not None:
+            await self.semantic_cache.asave()
+        session_loop = self._session_loop
+        last_user = self._release_session()
+        if last_user and not FactCheckingAgent._retain_shared_session and session_loop is asyncio.get_running_loop():
+            # One-shot runs (asyncio.run from the CLI) must not leave the session open on a dead loop
+            await FactCheckingAgent.close_shared_session()
+    
+    async def _embed_question(self, question_text: str) -> Optional[List[float]]:
+        """Embed a question for semantic cache lookups; returns None if embedding fails
+
+        Embedding calls count against the Gemini quota, so they share the llm gate and gemini_limiter.
+        """
+        kwargs = {"model": self.embedding_model, "content": question_text, "task_type": "semantic_similarity"}
+        try:
+            async with self._gate("llm"):
+                if hasattr(genai, "embed_content_async"):
+                    result = await gemini_limiter.execute_with_limit_async(genai.embed_content_async, **kwargs)
+                else:
+                    result = await asyncio.to_thread(gemini_limiter.execute_with_limit, genai.embed_content, **kwargs)
+            return result["embedding"]
+        except Exception as e:
+            logger.warning("[CACHE:%.20s...] Embedding failed, skipping semantic cache: %s", question_text, e)
+            return None
+    
+    async def _cache_lookup(self, question_text: str, content: str) -> Tuple[Optional[Dict[str, Any]], Optional[List[float]]]:
+        """Return (cached analysis or None, question embedding or None)
+
+        The persistent store is tried first since an exact hit there needs no embedding.
+        """
+        content_hash = content_fingerprint(content)
+        if self.analysis_store is not None:
+            stored_analysis = await asyncio.to_thread(self.analysis_store.get, question_text, content_hash)
+            if stored_analysis is not None:
+                logger.debug("[CACHE:%.20s...] Analysis store hit", question_text)
+                return stored_analysis, None
+        if self.semantic_cache is None:
+            return None, None
+        embedding = await self._embed_question(question_text)
+        if embedding is None:
+            return None, None
+        cached_analysis = self.semantic_cache.lookup(embedding, content_hash)
+        if cached_analysis is not None:
+            logger.debug("[CACHE:%.20s...] Semantic cache hit", question_text)
+        return cached_analysis, embedding
+    
+    async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Process input data through the fact checking pipeline"""
+        logger.debug("[PROCESS] Entering process method")
+        try:
+            questions = input_data.get("questions", [])
+            content = input_data.get("content", "")
+            metadata = input_data.get("metadata", {})
+            logger.debug("[PROCESS] Received %s questions to process", len(questions))
+
+            if self.process_shards > 1 and len(questions) >= self.shard_threshold:
+                return await self._process_sharded(questions, content, metadata)
+
+            self._bind_loop()
+
+            # Pre-filter empty questions so the network work starts straight away
+            scheduled = [q for q in questions if q.get("question")]
+            if len(scheduled) < len(questions):
+                logger.warning("[PROCESS] Skipping %s empty question dicts", len(questions) - len(scheduled))
+            question_texts = [q["question"] for q in scheduled]
+
+            # Answer repeats and near-duplicates from the caches before touching any search API
+            lookups = await asyncio.gather(*(self._cache_lookup(q, content) for q in question_texts))
+            uncached = [q for q, (cached, _) in zip(question_texts, lookups) if cached is None]
+
+            # Search once per distinct query (up to case, spacing and punctuation), then fan the evidence back out
+            unique_queries = {}
+            for q in uncached:
+                unique_queries.setdefault(_canonical_query(q), q)
+            search_keys = list(unique_queries)
+            search_texts = list(unique_queries.values())
+
+            # Fetch evidence for all remaining questions in one batch per source
+            logger.debug("[PROCESS] Prefetching evidence for %s questions (%s unique searches)", len(uncached), len(search_texts))
+            draft_tasks = [self._draft_analysis(q, content) for q in uncached] if self.speculative_draft else []
+            web_batch, wiki_batch, *draft_batch = await asyncio.gather(
+                self._search_web_batch(search_texts),
+                self._search_wikipedia_batch(search_texts),
+                *draft_tasks
+            )
+            evidence_by_key = {key: (web_batch[i], wiki_batch[i]) for i, key in enumerate(search_keys)}
+            evidence = {q: evidence_by_key[_canonical_query(q)] for q in uncached}
+            drafts = dict(zip(uncached, draft_batch))
+            # When enabled, parsing a large batch off the loop thread keeps the remaining LLM calls moving
+            self._offload_parse = len(uncached) >= self.parse_pool_threshold
+            content_hash = content_fingerprint(content)
+
+            async def analyze_bounded(question_dict: Dict[str, Any], embedding: Optional[List[float]]) -> Dict[str, Any]:
+                async def analyze() -> Dict[str, Any]:
+                    # Cap in-flight analyses; per-API pacing is done by the tavily and llm gates
+                    async with self._analysis_sem:
+                        return await self._analyze_evidence(
+                            question_dict, content,
+                            evidence=evidence[question_dict["question"]],
+                            embedding=embedding,
+                            draft=drafts.get(question_dict["question"])
+                        )
+                # The same question about the same content, repeated in this batch or asked by a
+                # concurrent request, is analyzed once; each caller gets a deep copy of the
+                # result, so callers never share its nested evidence and source lists
+                analysis = await self._coalesce("analysis", f"{question_dict['question'].strip()}\0{content_hash}", analyze)
+                return copy.deepcopy(analysis)
+
+            logger.debug("[PROCESS] Starting concurrent processing of questions (max %s at a time)", self.analysis_concurrency)
+            tasks = []
+            for question_dict, (cached, embedding) in zip(scheduled, lookups):
+                if cached is not None:
+                    tasks.append(asyncio.sleep(0, result=cached))
+                else:
+                    tasks.append(analyze_bounded(question_dict, embedding))
+
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+
+            fact_checks = []
+            for question_dict, result in zip(scheduled, results):
+                if isinstance(result, BaseException):
+                    logger.warning("[PROCESS] Error analyzing evidence: %s", result)
+                    result = _failed_analysis(result)
+                fact_checks.append({
+                    "question": question_dict,
+                    "analysis": result
+                })
+            logger.debug("[PROCESS] Finished processing all questions")
 
-            print(f"--- [ANALYZE:{question_text[:20]}...] Calling LLM.generate_content ---")
+            logger.debug("[PROCESS] Returning results")
+            return {
+                "fact_checks": fact_checks,
+                "metadata": metadata
+            }
+            
+        except Exception as e:
+            logger.error("[PROCESS] FATAL EXCEPTION in process method: %s", e)
+            return {
+                "error": str(e),
+                "fact_checks": []
+            }
+    
+    async def _process_sharded(
+        self,
+        questions: List[Dict[str, Any]],
+        content: str,
+        metadata: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Fan a large batch out to worker processes, each running its own agent and event loop"""
+        cls = FactCheckingAgent
+        if cls._shard_pool is None:
+            # Spawned rather than forked: this process has threads (and their locks) running
+            cls._shard_pool = ProcessPoolExecutor(
+                max_workers=self.process_shards,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        shard_size = math.ceil(len(questions) / self.process_shards)
+        shards = [questions[i:i + shard_size] for i in range(0, len(questions), shard_size)]
+        # Workers neither shard again nor start pools of their own, and leave the
+        # semantic cache file to this process
+        worker_config = {
+            **self.config,
+            "process_shards": 1,
+            "parse_pool_threshold": math.inf,
+            "semantic_cache_path": None,
+        }
+        logger.debug("[PROCESS] Sharding %s questions across %s processes", len(questions), len(shards))
+        loop = asyncio.get_running_loop()
+        shard_results = await asyncio.gather(
+            *(loop.run_in_executor(cls._shard_pool, _process_shard, worker_config, shard, content) for shard in shards),
+            return_exceptions=True
+        )
+
+        fact_checks = []
+        for shard, result in zip(shards, shard_results):
+            if isinstance(result, BaseException) or "error" in result:
+                error = result if isinstance(result, BaseException) else result["error"]
+                logger.warning("[PROCESS] Shard of %s questions failed: %s", len(shard), error)
+                fact_checks.extend(
+                    {"question": question_dict, "analysis": _failed_analysis(error)}
+                    for question_dict in shard if question_dict.get("question")
+                )
+            else:
+                fact_checks.extend(result["fact_checks"])
+        return {
+            "fact_checks": fact_checks,
+            "metadata": metadata
+        }
+    
+    async def _coalesce(
+        self,
+        kind: str,
+        question_text: str,
+        fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Run fetch() once per question at a time; concurrent callers share its result"""
+        key = f"{kind}:{self._search_cache_key(question_text)}"
+        loop = asyncio.get_running_loop()
+        future = FactCheckingAgent._inflight.get(key)
+        while future is not None and future.get_loop() is loop:
+            logger.debug("[%s:%.20s...] Joining in-flight %s", kind.upper(), question_text, kind)
+            try:
+                # Shield so a cancelled follower doesn't cancel the work for everyone else
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Re-raise if this follower was cancelled itself (Task.cancelling is 3.11+)
+                cancelling = getattr(asyncio.current_task(), "cancelling", None)
+                if not future.cancelled() or (cancelling is not None and cancelling()):
+                    raise
+            # The leader was cancelled: join a newer leader, or take over the work
+            future = FactCheckingAgent._inflight.get(key)
+        future = loop.create_future()
+        FactCheckingAgent._inflight[key] = future
+        try:
+            result = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Followers re-raise it; don't log it as unretrieved
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if FactCheckingAgent._inflight.get(key) is future:
+                del FactCheckingAgent._inflight[key]
+    
+    async def _with_retry(
+        self,
+        request: Callable[[], Awaitable[Any]],
+        attempts: int = 3,
+        base: float = 0.5,
+        cap: float = 8.0,
+        retry_statuses: Tuple[int, ...] = _RETRY_STATUSES
+    ) -> Any:
+        """Run request(), retrying transient HTTP failures with capped exponential backoff"""
+        for attempt in range(attempts):
             try:
-                # Use gemini_limiter to handle rate limiting and retries
-                loop = asyncio.get_running_loop()
-                response = await loop.run_in_executor(
-                    None,  # Default executor
-                    lambda: gemini_limiter.execute_with_limit(
-                        self.model.generate_content,
-                        prompt
-                    )
+                return await request()
+            except aiohttp.ClientResponseError as e:
+                if e.status not in retry_statuses or attempt == attempts - 1:
+                    raise
+                delay = _retry_after_seconds(e.headers)
+                if delay is not None and delay > cap:
+                    raise  # Asked to wait longer than we're willing to block a question
+                reason = e.status
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == attempts - 1:
+                    raise
+                delay = None
+                reason = type(e).__name__
+            if delay is None:
+                delay = min(cap, base * 2 ** attempt) + random.random() * 0.1
+            logger.warning("Transient HTTP failure (%s), retrying in %.1fs (attempt %s/%s)", reason, delay, attempt + 1, attempts)
+            await asyncio.sleep(delay)
+    
+    @staticmethod
+    def _web_cache_text(question_text: str, depth: str) -> str:
+        """Text the web cache and in-flight searches are keyed on; each depth has its own entries"""
+        return question_text if depth == "advanced" else f"{depth}:{question_text}"
+    
+    async def _search_web(self, question_text: str, depth: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Search the web for evidence using Tavily API
+        
+        depth is Tavily's search_depth; by default "advanced", or "basic" with adaptive_search.
+        """
+        logger.debug("[TAVILY:%.20s...] Entering _search_web", question_text)
+        depth = depth or ("basic" if self.adaptive_search else "advanced")
+        cache_text = self._web_cache_text(question_text, depth)
+        cached = self._cache_get(self._web_cache, cache_text)
+        if cached is not None:
+            logger.debug("[TAVILY:%.20s...] Cache hit", question_text)
+            return cached
+        return await self._coalesce("web", cache_text, lambda: self._fetch_web(question_text, depth))
+    
+    async def _fetch_web(self, question_text: str, depth: str = "advanced") -> List[Dict[str, Any]]:
+        """Run the Tavily search for a question that isn't cached or already in flight"""
+        try:
+            session = await self._get_session()
+            body = orjson.dumps({
+                "query": question_text,
+                "search_depth": depth,
+                "max_results": _WEB_MAX_RESULTS[depth]
+            })
+
+            async def post_search() -> Dict[str, Any]:
+                async with session.post(self.tavily_api_endpoint, data=body, headers=self._tavily_headers) as http_response:
+                    # Raised errors carry the status (e.g. 429) so tavily_limiter can back off
+                    http_response.raise_for_status()
+                    return orjson.loads(await http_response.read())
+
+            async def post_search_with_retry() -> Dict[str, Any]:
+                # 429s are left to tavily_limiter, which owns Tavily's shared cooldown
+                return await self._with_retry(post_search, retry_statuses=_SERVER_ERROR_STATUSES)
+
+            logger.debug("[TAVILY:%.20s...] Posting search with rate limiting", question_text)
+            async with self._gate("tavily"):
+                response = await tavily_limiter.execute_with_limit_async(post_search_with_retry)
+            logger.debug("[TAVILY:%.20s...] Search returned", question_text)
+            # Extract relevant info from Tavily results
+            results = response.get('results', [])
+            processed_results = [{"url": r.get('url'), "content": r.get('content')} for r in results]
+            logger.debug("[TAVILY:%.20s...] Found %s results", question_text, len(processed_results))
+            self._cache_put(self._web_cache, self._web_cache_text(question_text, depth), processed_results)
+            return processed_results
+        except Exception as e:
+            logger.error("[TAVILY:%.20s...] EXCEPTION in _search_web: %s", question_text, e)
+            return [] # Return empty list on error
+    
+    async def _search_wikipedia(self, question_text: str) -> List[Dict[str, Any]]:
+        """Search Wikipedia for relevant information based on question text"""
+        logger.debug("[WIKI:%.20s...] Entering _search_wikipedia", question_text)
+        cached = self._cache_get(self._wiki_cache, question_text)
+        if cached is not None:
+            logger.debug("[WIKI:%.20s...] Cache hit", question_text)
+            return cached
+        return await self._coalesce("wiki", question_text, lambda: self._fetch_wikipedia(question_text))
+    
+    async def _fetch_wikipedia(self, question_text: str) -> List[Dict[str, Any]]:
+        """Query the Wikipedia API for a question that isn't cached or already in flight"""
+        try:
+            session = await self._get_session()
+            # Use question text for search terms
+            search_terms = question_text
+
+            # Search Wikipedia API
+            params = {
+                "action": "query", "format": "json", "list": "search",
+                "srsearch": search_terms, "utf8": 1, "srlimit": 3
+            }
+            logger.debug("[WIKI:%.20s...] Calling session.get with params: %s", question_text, params)
+
+            async def get_search() -> Dict[str, Any]:
+                async with session.get(self.wiki_api_endpoint, params=params) as response:
+                    logger.debug("[WIKI:%.20s...] session.get returned status: %s", question_text, response.status)
+                    response.raise_for_status()
+                    # orjson parses straight from the raw bytes, skipping the decode-to-str step
+                    return orjson.loads(await response.read())
+
+            async with self._gate("wiki"):
+                data = await self._with_retry(get_search)
+            logger.debug("[WIKI:%.20s...] Processing results", question_text)
+            processed_results = self._process_wiki_results(data)
+            logger.debug("[WIKI:%.20s...] Found %s results", question_text, len(processed_results))
+            self._cache_put(self._wiki_cache, question_text, processed_results)
+            return processed_results
+
+        except Exception as e:
+            logger.error("[WIKI:%.20s...] EXCEPTION in _search_wikipedia: %s", question_text, e)
+            return []
+
+    async def _search_web_batch(self, questions: List[str]) -> List[List[Dict[str, Any]]]:
+        """Run Tavily searches for several questions concurrently, preserving order"""
+        results = await asyncio.gather(*(self._search_web(q) for q in questions), return_exceptions=True)
+        return [r if isinstance(r, list) else [] for r in results]
+    
+    async def _search_wikipedia_batch(self, questions: List[str]) -> List[List[Dict[str, Any]]]:
+        """Run Wikipedia searches for several questions over the shared session, preserving order"""
+        await self._get_session()  # Open the pool once before fanning out
+        results = await asyncio.gather(*(self._search_wikipedia(q) for q in questions), return_exceptions=True)
+        return [r if isinstance(r, list) else [] for r in results]
+    
+    async def _generate(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> Any:
+        """Send a prompt to the Gemini model through gemini_limiter, paced and capped by the llm gate"""
+        if not hasattr(self, 'model') or self.model is None:
+            logger.warning("ERROR: Generative model not initialized.")
+            raise ValueError("Generative model not available for analysis.")
+        kwargs = {"generation_config": generation_config} if generation_config else {}
+        async with self._gate("llm"):
+            if hasattr(self.model, "generate_content_async"):
+                # Native async call keeps the event loop free for other questions
+                return await gemini_limiter.execute_with_limit_async(self.model.generate_content_async, prompt, **kwargs)
+            # Blocking SDK call: run it on a worker thread instead of the event loop
+            return await asyncio.to_thread(gemini_limiter.execute_with_limit, self.model.generate_content, prompt, **kwargs)
+
+    async def _draft_analysis(self, question_text: str, content: str) -> Optional[str]:
+        """Speculatively analyze a question from the content alone, before any evidence arrives"""
+        prompt = "".join([
+            _ANALYSIS_PREAMBLE,
+            "Original Content to Check:\n", content,
+            "\n\nSpecific Claim/Question to Verify:\n", question_text,
+            "\n\nNo search evidence is available yet. Give a preliminary analysis based on the content "
+            "and well-established knowledge only, and say so where evidence is needed.\n\n",
+            _ANALYSIS_INSTRUCTIONS,
+        ])
+        try:
+            response = await self._generate(prompt)
+            return response.text or None
+        except Exception as e:
+            logger.warning("[DRAFT:%.20s...] Draft analysis failed: %s", question_text, e)
+            return None
+
+    async def _analyze_evidence(
+        self,
+        question_dict: Dict[str, Any],
+        content: str,
+        evidence: Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]] = None,
+        embedding: Optional[List[float]] = None,
+        draft: Optional[str] = None,
+        deep_search: bool = False
+    ) -> Dict[str, Any]:
+        """Analyze the evidence for a specific question using search results.
+        
+        evidence is an optional prefetched (web_results, wiki_results) pair; when omitted
+        the searches are run here. embedding, if given, is used to store the result in
+        the semantic cache. draft is an optional evidence-free analysis from
+        _draft_analysis that the LLM is asked to refine. deep_search marks a re-analysis
+        with advanced-depth web results, which is not escalated again.
+        """
+        question_text = question_dict.get("question", "Unknown question")
+        logger.debug("[ANALYZE:%.20s...] Entering _analyze_evidence", question_text)
+        try:
+            content_hash = content_fingerprint(content)
+            web_error = None
+            wiki_error = None
+            if evidence is not None:
+                # 1. Evidence was prefetched by process()
+                web_results, wiki_results = evidence
+            else:
+                # 1. Run both searches at once; the per-API gates and limiters handle pacing
+                logger.debug("[ANALYZE:%.20s...] Starting concurrent search tasks", question_text)
+                web_results, wiki_results = await asyncio.gather(
+                    self._search_web(question_text),
+                    self._search_wikipedia(question_text),
+                    return_exceptions=True
+                )
+                if isinstance(web_results, Exception):
+                    web_error, web_results = web_results, []
+                    logger.warning("[ANALYZE:%.20s...] Web search resulted in error: %s", question_text, web_error)
+                if isinstance(wiki_results, Exception):
+                    wiki_error, wiki_results = wiki_results, []
+                    logger.warning("[ANALYZE:%.20s...] Wiki search resulted in error: %s", question_text, wiki_error)
+                logger.debug("[ANALYZE:%.20s...] Finished concurrent search tasks", question_text)
+
+            # Normalise once; anything but a list counts as no results
+            web_list = web_results if isinstance(web_results, list) else []
+            wiki_list = wiki_results if isinstance(wiki_results, list) else []
+
+            # Without any evidence the LLM can only say it is unable to verify; skip the call
+            if not web_list and not wiki_list:
+                if self.adaptive_search and not deep_search:
+                    deeper = await self._reanalyze_deeper(question_dict, content, web_list, wiki_list, embedding, draft)
+                    if deeper is not None:
+                        return deeper
+                logger.debug("[ANALYZE:%.20s...] No evidence found, skipping LLM analysis", question_text)
+                if draft:
+                    # The speculative draft is already the best answer available
+                    draft_analysis = await self._parse_response(draft, question_text)
+                    draft_analysis["sources"] = ["LLM Analysis based on content"]
+                    return draft_analysis
+                return FactAnalysis(
+                    verification_status="Unable to Verify",
+                    confidence_score=0.0,
+                    reasoning="No evidence sources returned results; unable to verify.",
+                    evidence_gaps=["No web or Wikipedia results were found for this question."],
+                ).to_dict()
+
+            # Create a summary from the evidence for easier analysis. Each source appears
+            # once, shortened so the evidence as a whole stays within the prompt budget
+            width = _source_width(len(web_list) + len(wiki_list))
+            summary_parts = ["Evidence Summary:\n"]
+            
+            # First the web evidence, collecting the source URLs in the same pass (a dict
+            # keeps them unique in first-seen order) and skipping results whose content
+            # repeats an earlier one
+            sources: Dict[str, None] = {}
+            seen_web = set()
+            for result in web_list:
+                url = result.get('url')
+                if url:
+                    sources[url] = None
+                result_content = (result.get('content') or '').strip()
+                if result_content[:100] in seen_web:
+                    continue
+                seen_web.add(result_content[:100])
+                snippet = _shorten(result_content, width)
+                if snippet:
+                    summary_parts.append(f"\nWeb Source #{len(seen_web)} ({url or 'Unknown source'}):\n{snippet}\n")
+            if not web_list:
+                summary_parts.append(f"\nError during web search: {web_error}\n" if web_error
+                                     else "\nNo web results found.\n")
+            
+            # Then the Wikipedia evidence
+            summary_parts.append("\nWikipedia Evidence:\n")
+            for result in wiki_list:
+                snippet = _shorten(result.get('snippet', '').strip(), width)
+                if snippet:
+                    summary_parts.append(f"- {result.get('title', 'Unknown topic')}: {snippet}\n")
+            if not wiki_list:
+                summary_parts.append(f"Error during Wikipedia search: {wiki_error}\n" if wiki_error
+                                     else "No Wikipedia results found.\n")
+
+            # 2. Create the analysis prompt including search evidence with improved instructions.
+            # All pieces are joined once so large content isn't copied by intermediate strings
+            prompt = "".join([
+                _ANALYSIS_PREAMBLE,
+                "Original Content to Check:\n", content,
+                "\n\nSpecific Claim/Question to Verify:\n", question_text,
+                "\n\n", *summary_parts,
+                "\n",
+                *(("Preliminary Analysis (written before the evidence above was available; "
+                   "revise it wherever the evidence disagrees):\n", draft, "\n\n") if draft else ()),
+                _STRUCTURED_ANALYSIS_INSTRUCTIONS if self.structured_output else _ANALYSIS_INSTRUCTIONS,
+            ])
+
+            # 3. Get the model's response
+            logger.debug("[ANALYZE:%.20s...] Calling LLM.generate_content", question_text)
+            try:
+                response = await self._generate(
+                    prompt, _STRUCTURED_GENERATION_CONFIG if self.structured_output else None
                 )
-                print(f"--- [ANALYZE:{question_text[:20]}...] LLM.generate_content returned ---")
+                logger.debug("[ANALYZE:%.20s...] LLM.generate_content returned", question_text)
             except Exception as e:
-                print(f"--- [ANALYZE:{question_text[:20]}...] Error calling LLM: {str(e)} ---")
+                logger.warning("[ANALYZE:%.20s...] Error calling LLM: %s", question_text, e)
                 raise ValueError(f"Failed to get LLM response: {str(e)}")
 
             # 4. Parse the response
-            print(f"--- [ANALYZE:{question_text[:20]}...] Parsing LLM response ---")
+            logger.debug("[ANALYZE:%.20s...] Parsing LLM response", question_text)
             if response.text:
-                parsed_analysis = self._parse_analysis(response.text, question_text)
+                parsed_analysis = await self._parse_response(response.text, question_text, self.structured_output)
                 # Log the verification status to help with debugging
                 status = parsed_analysis.get("verification_status", "Unknown")
-                print(f"--- [ANALYZE:{question_text[:20]}...] Verification Status: {status} ---")
+                logger.debug("[ANALYZE:%.20s...] Verification Status: %s", question_text, status)
+                if status == "Unable to Verify" and self.adaptive_search and not deep_search:
+                    deeper = await self._reanalyze_deeper(question_dict, content, web_list, wiki_list, embedding, draft)
+                    if deeper is not None:
+                        return deeper
                 
                 # Add sources based on successful searches
-                sources = []
-                if isinstance(web_results, list) and web_results:
-                    sources.extend([r.get('url', 'Tavily') for r in web_results if r.get('url')])
-                if isinstance(wiki_results, list) and wiki_results:
-                     sources.append("Wikipedia")
+                if wiki_list:
+                    sources["Wikipedia"] = None
                 if not sources:
-                    sources.append("LLM Analysis based on content")
+                    sources["LLM Analysis based on content"] = None
 
-                # Ensure confidence_score is a float - this fixes the toFixed() error in the frontend
-                if "confidence_score" in parsed_analysis:
+                # Ensure confidence_score is a float - this fixes the toFixed() error in the frontend.
+                # The parser always scores a float, so conversion is only the fallback
+                if "confidence_score" in parsed_analysis and type(parsed_analysis["confidence_score"]) is not float:
                     try:
                         parsed_analysis["confidence_score"] = float(parsed_analysis["confidence_score"])
                     except (ValueError, TypeError):
                         parsed_analysis["confidence_score"] = 0.5  # Default to 0.5 if conversion fails
                 
-                parsed_analysis["sources"] = list(set(sources)) # Unique sources
+                parsed_analysis["sources"] = list(sources)
                 
-                # Print source evaluations and confidence score for debugging
+                # Log source evaluations and confidence score for debugging
                 source_evaluations = parsed_analysis.get("source_evaluations", [])
-                if source_evaluations:
-                    print(f"--- [ANALYZE:{question_text[:20]}...] Source Evaluations:")
+                if source_evaluations and logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("[ANALYZE:%.20s...] Source Evaluations:", question_text)
                     for eval in source_evaluations:
-                        print(f"  - {eval['source']}: {eval['verdict']} - {eval['reason'][:50]}...")
+                        logger.debug("  - %s: %s - %.50s...", eval['source'], eval['verdict'], eval['reason'])
                 
-                print(f"--- [ANALYZE:{question_text[:20]}...] Finished analysis with confidence score: {parsed_analysis.get('confidence_score')} ---")
+                logger.debug("[ANALYZE:%.20s...] Finished analysis with confidence score: %s", question_text, parsed_analysis.get('confidence_score'))
+                if embedding is not None and self.semantic_cache is not None:
+                    self.semantic_cache.add(embedding, content_hash, parsed_analysis)
+                if self.analysis_store is not None:
+                    await asyncio.to_thread(self.analysis_store.put, question_text, content_hash, parsed_analysis)
                 return parsed_analysis
             else:
-                 print(f"--- [ANALYZE:{question_text[:20]}...] LLM response empty ---")
+                 logger.warning("[ANALYZE:%.20s...] LLM response empty", question_text)
                  # Return error structure matching parsed format
-                 return {
-                     "verification_status": "Unable to Verify", "confidence_score": 0.5,  # Use float for confidence_score
-                     "supporting_evidence": [], "contradicting_evidence": [],
-                     "reasoning": "Failed to get analysis from LLM", "evidence_gaps": [],
-                     "recommendations": [], "sources": [], "source_evaluations": []
-                 }
+                 return FactAnalysis(
+                     verification_status="Unable to Verify", confidence_score=0.5,  # Use float for confidence_score
+                     reasoning="Failed to get analysis from LLM"
+                 ).to_dict()
 
         except Exception as e:
-            print(f"--- [ANALYZE:{question_text[:20]}...] EXCEPTION in _analyze_evidence: {e} ---")
+            logger.error("[ANALYZE:%.20s...] EXCEPTION in _analyze_evidence: %s", question_text, e)
             # Return error structure matching parsed format
-            return {
-                 "verification_status": "Error", "confidence_score": 0.0,
-                 "supporting_evidence": [], "contradicting_evidence": [],
-                 "reasoning": f"Error during analysis: {str(e)}", "evidence_gaps": [],
-                 "recommendations": [], "sources": [], "source_evaluations": []
-            }
+            return FactAnalysis(
+                verification_status="Error", confidence_score=0.0,
+                reasoning=f"Error during analysis: {str(e)}"
+            ).to_dict()
+    
+    async def _reanalyze_deeper(
+        self,
+        question_dict: Dict[str, Any],
+        content: str,
+        web_list: List[Dict[str, Any]],
+        wiki_list: List[Dict[str, Any]],
+        embedding: Optional[List[float]],
+        draft: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Re-analyze with an advanced-depth web search; None if it finds nothing new"""
+        question_text = question_dict.get("question", "Unknown question")
+        deep_results = await self._search_web(question_text, depth="advanced")
+        if not deep_results or deep_results == web_list:
+            return None
+        logger.debug("[ANALYZE:%.20s...] Unable to verify from basic search, retrying with advanced depth", question_text)
+        return await self._analyze_evidence(
+            question_dict, content, evidence=(deep_results, wiki_list),
+            embedding=embedding, draft=draft, deep_search=True
+        )
     
     def _process_search_results(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """(Deprecated/Not Used - Tavily processing is inline in _search_web)"""
@@ -391,314 +951,35 @@ Answer ONLY with the structured analysis exactly as outlined above, with numbere
         return []
     
     def _process_wiki_results(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Process and structure Wikipedia results"""
-        results = []
-        try:
-            for item in data.get("query", {}).get("search", []):
-                results.append({
-                    "title": item.get("title"),
-                    # Clean snippet from HTML tags (simple approach)
-                    "snippet": item.get("snippet", "").replace('<span class="searchmatch">', '').replace('</span>', ''),
-                    "pageid": item.get("pageid")
-                })
-        except Exception as e:
-            print(f"Error processing Wikipedia results: {e}")
-        return results
-    
-    def _parse_analysis(self, text: str, question_text: str = "") -> Dict[str, Any]:
-        """Parse the model's analysis response with improved accuracy for verification status and reasoning"""
-        analysis = {
-            "verification_status": "Unknown",
-            "confidence_score": 0.5,  # Default to 0.5 instead of 0.0
-            "supporting_evidence": [],
-            "contradicting_evidence": [],
-            "reasoning": "",
-            "evidence_gaps": [],
-            "recommendations": [],
-            "sources": [], # Sources will be added in _analyze_evidence
-            "source_evaluations": []  # Track individual source evaluations
-        }
-        current_section = None
-        buffer = []
-
-        # First, extract specific verification status using regex for better precision
-        import re
-        
-        # Try to find the verification status section with its value
-        verification_pattern = re.search(r'(?:1\.|[Vv]erification\s*[Ss]tatus:?)\s*(?:")?([^"\n.]+)(?:")?', text)
-        if verification_pattern:
-            raw_status = verification_pattern.group(1).strip()
-            # Map status to standardized values
-            status_mapping = {
-                'verified': "Verified",
-                'true': "Verified",
-                'confirm': "Verified",
-                'false': "False", 
-                'incorrect': "False",
-                'untrue': "False",
-                'partially true': "Partially True",
-                'partially': "Partially True",
-                'partly': "Partially True",
-                'misleading': "Misleading",
-                'unsubstantiated': "Unsubstantiated",
-                'unsupported': "Unsubstantiated",
-                'unable to verify': "Unable to Verify",
-                'insufficient': "Unable to Verify",
-                'unclear': "Unable to Verify"
+        """Process and structure Wikipedia results; malformed payloads raise to _fetch_wikipedia"""
+        return [
+            {
+                "title": item.get("title"),
+                # Strip any HTML markup, then decode entities such as &amp; and &quot;
+                "snippet": html.unescape(_HTML_TAG_RE.sub('', item.get("snippet", ""))),
+                "pageid": item.get("pageid")
             }
-            
-            # Find matching status
-            status_lower = raw_status.lower()
-            matched = False
-            for key, value in status_mapping.items():
-                if key in status_lower:
-                    analysis["verification_status"] = value
-                    matched = True
-                    break
-            
-            # If no match found, use the raw status with first letter capitalized
-            if not matched:
-                analysis["verification_status"] = raw_status.capitalize()
-        
-        # Extract source evaluations and count YES/NO responses
-        source_eval_section = re.search(r'(?:2\.|[Ss]ource\s*[Ee]valuation:?)(.*?)(?:3\.|[Ss]upporting\s*[Ee]vidence:?)', text, re.DOTALL)
-        yes_count = 0
-        no_count = 0
-        
-        if source_eval_section:
-            source_lines = source_eval_section.group(1).strip().split('\n')
-            for line in source_lines:
-                line = line.strip()
-                if not line or line.startswith('-') and len(line) < 3:  # Skip empty lines or just bullet points
-                    continue
-                    
-                # Extract source evaluations using regex
-                source_match = re.search(r'[-•*]?\s*(.*?):\s*(YES|NO|yes|no|Yes|No)\s*-\s*(.*)', line)
-                if source_match:
-                    source = source_match.group(1).strip()
-                    verdict = source_match.group(2).upper()
-                    reason = source_match.group(3).strip()
-                    
-                    analysis["source_evaluations"].append({
-                        "source": source,
-                        "verdict": verdict,
-                        "reason": reason
-                    })
-                    
-                    if verdict == "YES":
-                        yes_count += 1
-                    elif verdict == "NO":
-                        no_count += 1
-        
-        # Calculate confidence score based on proportion of YES/NO responses
-        total_sources = yes_count + no_count
-        if total_sources > 0:
-            # Handle confidence calculation based on verification status AND question context
-            status = analysis["verification_status"].lower()
-            
-            # Get the question text to analyze context
-            question_context = question_text if 'question_text' in locals() else ""
-            
-            # For "False" claims, NO responses contribute to confidence
-            if "false" in status:
-                analysis["confidence_score"] = no_count / total_sources
-            # For "Unsubstantiated" claims, the interpretation depends on the question context
-            elif "unsubstantiated" in status or "unable to verify" in status:
-                # Check if the question is asking about "evidence exists" or "origins"
-                evidence_patterns = [
-                    r'what evidence',
-                    r'is there evidence', 
-                    r'is there any evidence',
-                    r'evidence.*exists',
-                    r'evidence.*support',
-                    r'origins of',
-                    r'source of',
-                    r'where.*come from'
-                ]
-                
-                # If question asks about evidence existence, and sources say NO (no evidence),
-                # then this SUPPORTS the "Unsubstantiated" verdict with high confidence
-                is_evidence_question = any(re.search(pattern, question_context.lower()) for pattern in evidence_patterns)
-                
-                if is_evidence_question:
-                    # For evidence questions, NO answers actually support the "Unsubstantiated" verdict
-                    analysis["confidence_score"] = no_count / total_sources
-                    print(f"--- [PARSE] Evidence-seeking question detected. NO answers support 'Unsubstantiated' verdict.")
-                else:
-                    # Default behavior for other types of unsubstantiated claims
-                    analysis["confidence_score"] = 0.5  # Neutral confidence for unclear cases
-            else:
-                # For "Verified" and other positive claims, YES responses contribute to confidence
-                analysis["confidence_score"] = yes_count / total_sources
-        else:
-            # If no sources were evaluated, use a default based on verification status
-            status = analysis["verification_status"].lower()
-            if "verified" in status:
-                analysis["confidence_score"] = 0.85
-            elif "false" in status:
-                analysis["confidence_score"] = 0.85  # High confidence for false claims too
-            elif "partially true" in status:
-                analysis["confidence_score"] = 0.5
-            elif "misleading" in status:
-                analysis["confidence_score"] = 0.3
-            elif "unsubstantiated" in status:
-                analysis["confidence_score"] = 0.2
-            else:  # Unable to verify
-                analysis["confidence_score"] = 0.5
-        
-        # Now process the text line by line to extract the full sections
-        lines = text.split("\n")
-        for i, line in enumerate(lines):
-            line_strip = line.strip()
-            if not line_strip and not buffer:  # Skip empty lines between sections
-                continue
-
-            # Detect headers (case-insensitive)
-            lower_line = line_strip.lower()
-            new_section = None
-            
-            # Improved section detection with precise patterns
-            if re.search(r'^(?:1\.|[Vv]erification\s*[Ss]tatus)', lower_line):
-                new_section = "verification_status"
-            elif re.search(r'^(?:2\.|[Ss]ource\s*[Ee]valuation)', lower_line):
-                new_section = "source_evaluation"
-            elif re.search(r'^(?:3\.|[Ss]upporting\s*[Ee]vidence)', lower_line):
-                new_section = "supporting_evidence"
-            elif re.search(r'^(?:4\.|[Cc]ontradicting\s*[Ee]vidence)', lower_line):
-                new_section = "contradicting_evidence"
-            elif re.search(r'^(?:5\.|[Rr]easoning)', lower_line):
-                new_section = "reasoning"
-            elif re.search(r'^(?:6\.|[Ee]vidence\s*[Gg]aps)', lower_line):
-                new_section = "evidence_gaps"
-            elif re.search(r'^(?:7\.|[Rr]ecommendation)', lower_line):
-                new_section = "recommendations"
-
-            # If new section detected, process buffer for previous section
-            if new_section:
-                # Process previous section if any
-                if current_section:
-                    section_content = "\n".join(filter(None, buffer)).strip()  # Join non-empty lines
-                    if current_section in ["supporting_evidence", "contradicting_evidence", "evidence_gaps", "recommendations"]:
-                        # Process list items with improved regex
-                        items = []
-                        item_buffer = ""
-                        for item_line in section_content.split('\n'):
-                            item_line = item_line.strip()
-                            if not item_line:
-                                continue
-                                
-                            # Check if this line starts a new list item
-                            if re.match(r'^[-•*]|\d+[\.)]|\s-\s', item_line):
-                                # If we have a buffer from previous item, add it
-                                if item_buffer:
-                                    items.append(item_buffer)
-                                # Start new item buffer, removing the bullet/number
-                                item_buffer = re.sub(r'^[-•*]|\d+[\.)]|\s-\s', '', item_line).strip()
-                            else:
-                                # Continue previous item (if exists) or start new one
-                                if item_buffer:
-                                    item_buffer += " " + item_line
-                                else:
-                                    item_buffer = item_line
-                                    
-                        # Add the last item if exists
-                        if item_buffer:
-                            items.append(item_buffer)
-                            
-                        analysis[current_section] = items
-                    elif current_section != "source_evaluation":  # Skip source_evaluation as we've already processed it
-                        analysis[current_section] = section_content
-                
-                # Reset buffer for new section, first line may contain the section header 
-                # Extract content after the colon/period if present
-                content_match = re.search(r'(?:^[0-9]+\.|\:)\s*(.*?)$', line_strip)
-                if content_match:
-                    buffer = [content_match.group(1)]
-                else:
-                    buffer = []
-                current_section = new_section
-            elif current_section:
-                # Continue adding to buffer for the current section
-                # Don't include section header definitions in the content
-                if not re.match(r'^[-•*](?:\s+".*?"\s*-|\s+[A-Z].*?:)', line_strip):
-                    buffer.append(line_strip)
-
-        # Process the buffer for the last section
-        if current_section and buffer and current_section != "source_evaluation":
-            section_content = "\n".join(filter(None, buffer)).strip()
-            if current_section in ["supporting_evidence", "contradicting_evidence", "evidence_gaps", "recommendations"]:
-                # Process list items
-                items = []
-                item_buffer = ""
-                for item_line in section_content.split('\n'):
-                    item_line = item_line.strip()
-                    if not item_line:
-                        continue
-                        
-                    # Check if this line starts a new list item
-                    if re.match(r'^[-•*]|\d+[\.)]|\s-\s', item_line):
-                        # If we have a buffer from previous item, add it
-                        if item_buffer:
-                            items.append(item_buffer)
-                        # Start new item buffer, removing the bullet/number
-                        item_buffer = re.sub(r'^[-•*]|\d+[\.)]|\s-\s', '', item_line).strip()
-                    else:
-                        # Continue previous item (if exists) or start new one
-                        if item_buffer:
-                            item_buffer += " " + item_line
-                        else:
-                            item_buffer = item_line
-                            
-                # Add the last item if exists
-                if item_buffer:
-                    items.append(item_buffer)
-                    
-                analysis[current_section] = items
-            else:  # For verification_status, reasoning
-                analysis[current_section] = section_content
-
-        # Make sure reasoning is not empty
-        if not analysis["reasoning"]:
-            # Try to extract reasoning from the text if the section wasn't properly identified
-            reasoning_match = re.search(r'(?:5\.|[Rr]easoning:?)\s*(.*?)(?:(?:6\.|[Ee]vidence\s*[Gg]aps)|$)', text, re.DOTALL)
-            if reasoning_match:
-                analysis["reasoning"] = reasoning_match.group(1).strip()
-            else:
-                # Create a simple reasoning based on verification status
-                status = analysis["verification_status"]
-                analysis["reasoning"] = f"Based on the evidence, the claim is determined to be {status}."
+            # No throwaway {} per call; a null "query" or "search" also counts as no results
+            for item in (data.get("query") or {}).get("search") or ()
+        ]
 
-        # Ensure confidence_score is a float
+
+def _process_shard(config: Dict[str, Any], questions: List[Dict[str, Any]], content: str) -> Dict[str, Any]:
+    """Worker-process entry point: fact-check one shard of a batch with a fresh agent"""
+    async def run() -> Dict[str, Any]:
+        agent = FactCheckingAgent(config)
         try:
-            analysis["confidence_score"] = float(analysis["confidence_score"])
-        except (ValueError, TypeError):
-            analysis["confidence_score"] = 0.5
-            
-        # Debug log the source evaluations
-        print(f"--- [PARSE] Found {yes_count} YES and {no_count} NO evaluations from sources")
-        print(f"--- [PARSE] Verification status: {analysis['verification_status']}")
-        
-        # Enhanced debugging for different question types
-        status = analysis["verification_status"].lower()
-        if "false" in status:
-            print(f"--- [PARSE] For FALSE claims, NO answers increase confidence: {analysis['confidence_score']:.2f}")
-        elif "unsubstantiated" in status or "unable to verify" in status:
-            # Check if we detected an evidence-seeking question
-            evidence_patterns = [
-                r'what evidence', r'is there evidence', r'is there any evidence',
-                r'evidence.*exists', r'evidence.*support', r'origins of',
-                r'source of', r'where.*come from'
-            ]
-            is_evidence_question = any(re.search(pattern, question_text.lower()) for pattern in evidence_patterns)
-            
-            if is_evidence_question:
-                print(f"--- [PARSE] Evidence-seeking question detected: '{question_text[:50]}...'")
-                print(f"--- [PARSE] For UNSUBSTANTIATED claims with evidence questions, NO answers increase confidence: {analysis['confidence_score']:.2f}")
-            else:
-                print(f"--- [PARSE] For UNSUBSTANTIATED claims (non-evidence questions), confidence is neutral: {analysis['confidence_score']:.2f}")
-        else:
-            print(f"--- [PARSE] For non-FALSE claims, YES answers increase confidence: {analysis['confidence_score']:.2f}")
-            
-        print(f"--- [PARSE] Final confidence score: {analysis['confidence_score']}")
+            return await agent.process({"questions": questions, "content": content})
+        finally:
+            await agent.aclose()
+    return asyncio.run(run())
+
+
+def _failed_analysis(error: Any) -> Dict[str, Any]:
+    """Analysis entry reported for a question whose analysis raised"""
+    analysis = FactAnalysis(
+        verification_status="error", confidence_score=0.0, reasoning=f"Analysis failed: {str(error)}"
+    ).to_dict()
+    analysis["error"] = f"Error during analysis: {str(error)}"
+    return analysis
 
-        return analysis 
\ No newline at end of file
@@ -1,8 +1,8 @@
-import google.generativeai as genai
 import traceback
 from typing import List, Dict, Any
 from .base_agent import BaseAgent
 from .personalities import AgentPersonalities
+from ..utils.genai_client import get_genai_model
 
 class FactQuestioningAgent(BaseAgent):
     """Agent that generates specific yes/no questions for fact verification"""
@@ -13,8 +13,7 @@ class FactQuestioningAgent(BaseAgent):
     def _configure_gemini(self):
         """Configure the Google Generative AI client."""
         try:
-            genai.configure(api_key=self.config["google_api_key"])
-            self.model = genai.GenerativeModel('gemini-1.5-pro')
+            self.model = get_genai_model(self.config["google_api_key"], 'gemini-1.5-pro')
             print(f"Gemini configured successfully for {self.personality['name']} ({self.personality['role']}).")
         except Exception as e:
             print(f"Error configuring Gemini: {e}")
@@ -207,7 +206,7 @@ Please improve these questions by:
         """Analyze the collected evidence and provide a fact-checking assessment."""
         print(f"\n--- {self.personality['name']} ({self.personality['role']}) analyzing evidence for: '{claim}' ---")
         try:
-            model = genai.GenerativeModel('gemini-1.5-pro')
+            model = self.model
             
             # Format evidence for analysis
             evidence_text = "\n".join([
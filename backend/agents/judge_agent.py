@@ -145,7 +145,7 @@ class JudgeAgent:
         valid_checks = 0
         high_confidence_count = 0
         
-        print(f"--- [JUDGE] Calculating average confidence from {len(fact_checks)} fact checks")
+        self.logger.debug("[JUDGE] Calculating average confidence from %s fact checks", len(fact_checks))
         
         for i, check in enumerate(fact_checks):
             try:
@@ -153,7 +153,7 @@ class JudgeAgent:
                 confidence = check.get('analysis', {}).get('confidence_score', 0.0)
                 
                 if isinstance(confidence, (int, float)) and confidence >= 0.0:
-                    print(f"--- [JUDGE] Check #{i+1}: Status '{status}', Confidence: {confidence}")
+                    self.logger.debug("[JUDGE] Check #%s: Status '%s', Confidence: %s", i + 1, status, confidence)
                     # All fact checks with high confidence should contribute positively
                     # regardless of their verification status
                     total_confidence += confidence
@@ -163,19 +163,19 @@ class JudgeAgent:
                     if confidence >= 0.99:
                         high_confidence_count += 1
             except Exception as e:
-                print(f"--- [JUDGE] Warning: Error getting confidence from check: {e}")
+                self.logger.warning("[JUDGE] Error getting confidence from check: %s", e)
                 
         if valid_checks == 0:
             return 0.5  # Default if no valid confidence scores
         
         # Special case: if ALL checks have 100% confidence, return 1.0
         if high_confidence_count == valid_checks and high_confidence_count > 0:
-            print(f"--- [JUDGE] All {valid_checks} checks have 100% confidence, returning 1.0")
+            self.logger.debug("[JUDGE] All %s checks have 100%% confidence, returning 1.0", valid_checks)
             return 1.0
         
         avg_confidence = total_confidence / valid_checks    
-        print(f"--- [JUDGE] Total confidence: {total_confidence}, Valid checks: {valid_checks}")
-        print(f"--- [JUDGE] Calculated average confidence: {avg_confidence}")
+        self.logger.debug("[JUDGE] Total confidence: %s, Valid checks: %s", total_confidence, valid_checks)
+        self.logger.debug("[JUDGE] Calculated average confidence: %s", avg_confidence)
         
         return avg_confidence
 
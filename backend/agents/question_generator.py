@@ -1,8 +1,12 @@
-import google.generativeai as genai
 import traceback
 from .personalities import AgentPersonalities
+from ..utils.genai_client import configure_genai, get_genai_model
 import re
 
+# Leading numbering ("1.", "1)", "[1]", ...) and bullet points on generated questions
+_NUMBERING_RE = re.compile(r'^\s*[\[\(]?\d+[\.\)\]]?\s*')
+_BULLET_RE = re.compile(r'^\s*[-•*]\s*')
+
 class QuestionGeneratorAgent:
     """Agent that uses Gemini to generate sub-questions from an initial query."""
     
@@ -13,7 +17,7 @@ class QuestionGeneratorAgent:
     def _configure_gemini(self):
         """Configure the Google Generative AI client."""
         try:
-            genai.configure(api_key=self.config["google_api_key"])
+            configure_genai(self.config["google_api_key"])
             print("Gemini configured successfully for Question Generator.")
         except Exception as e:
             print(f"Error configuring Gemini: {e}")
@@ -23,7 +27,7 @@ class QuestionGeneratorAgent:
         """Generate a list of specific questions based on the initial query."""
         print(f"\n--- Generating Sub-Questions for: '{initial_query}' ---")
         try:
-            model = genai.GenerativeModel('gemini-1.5-flash') 
+            model = get_genai_model(self.config["google_api_key"], 'gemini-1.5-flash')
             prompt = (
                 f"First, critically evaluate the following content: '{initial_query}'.\n"
                 f"STEP 1: Determine if this content contains ANY factual claims or assertions that could potentially be misinformation or disinformation. A factual claim is any statement presented as fact rather than opinion, even if subtle or implied.\n\n"
@@ -59,9 +63,9 @@ class QuestionGeneratorAgent:
                     
                     for q in raw_questions:
                         # Remove numbering (e.g., "1.", "1)", "[1]", etc.)
-                        q = re.sub(r'^\s*[\[\(]?\d+[\.\)\]]?\s*', '', q)
+                        q = _NUMBERING_RE.sub('', q)
                         # Remove bullet points
-                        q = re.sub(r'^\s*[-•*]\s*', '', q)
+                        q = _BULLET_RE.sub('', q)
                         if q and any(q.endswith(c) for c in ['?', '.', '!']):  # Ensure it's a question or statement
                             cleaned_questions.append(q)
                     
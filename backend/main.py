@@ -21,6 +21,7 @@ from .utils import setup_environment # Assuming utils is a subdirectory
 # Keep the original process_content for backward compatibility
 async def process_content(content: str, config: Dict[str, Any]) -> Dict[str, Any]:
     """Process content through the agent pipeline"""
+    fact_checker = None
     try:
         print("\nInitializing agents...")
         # Initialize services
@@ -126,6 +127,10 @@ async def process_content(content: str, config: Dict[str, Any]) -> Dict[str, Any
         print(f"\nError in processing pipeline: {str(e)}")
         traceback.print_exc()
         return {"error": str(e)}
+    finally:
+        # Save the fact checker's cache and, outside the server, close its pooled HTTP session
+        if fact_checker is not None:
+            await fact_checker.aclose()
 
 # New function that uses Portia integration
 async def process_content_with_portia(content: str, config: Dict[str, Any], session_id: str = None) -> Dict[str, Any]:
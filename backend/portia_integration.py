@@ -150,6 +150,8 @@ class FactCheckTool:
             
             # Run the async function and get the result
             result = loop.run_until_complete(self.fact_checker.process(input_data))
+            # The pooled session belongs to this loop, so release it before the loop goes away
+            loop.run_until_complete(FactCheckingAgent.close_shared_session())
             loop.close()
             
             return result
@@ -800,4 +802,7 @@ class PortiaFactChecker:
                 "initial_questions": [], "fact_checks": [], "follow_up_questions": [], "recommendations": [],
                 "judgment": "ERROR", "judgment_reason": f"Fact-checking pipeline failed: {str(e)}",
                 "metadata": {"confidence_scores": {"question_generator": 0.0, "fact_checking": 0.0, "follow_up_generator": 0.0, "judge": 0.0}}
-            } 
\ No newline at end of file
+            } 
+        finally:
+            # Save the fact checker's cache and, outside the server, close its pooled HTTP session
+            await self.fact_checking_agent.aclose()
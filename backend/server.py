@@ -4,18 +4,28 @@ from pydantic import BaseModel
 from typing import Optional, Dict, Any
 import traceback
 import logging
+import logging.handlers
+import queue
 
-# Configure logging to see rate limiting in action
+# Configure logging to see rate limiting in action. Records are handed to a
+# queue and written to stderr by a listener thread, so request handlers never
+# block on console I/O
+_log_queue = queue.SimpleQueue()
+_console_handler = logging.StreamHandler()
+_console_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
+_log_listener = logging.handlers.QueueListener(_log_queue, _console_handler)
+_log_listener.start()
 logger = logging.getLogger("server")
 
 # Use relative imports
 from .main import process_content, process_content_with_portia  # Import both processing methods
 from .config import load_config
 from .services.search_service import SearchService
+from .agents import FactCheckingAgent
 from .utils import tavily_limiter, gemini_limiter
 
 # Log rate limiter configuration on startup
@@ -34,6 +44,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Requests share one pooled HTTP session for the life of the server; agents' aclose() leaves it open
+FactCheckingAgent.retain_shared_session()
+
+@app.on_event("shutdown")
+async def release_shared_resources() -> None:
+    # Connections and parse workers are pooled across requests, so they are only released here
+    await FactCheckingAgent.close_shared_session()
+    FactCheckingAgent.shutdown_worker_pools()
+
+@app.on_event("shutdown")
+def stop_log_listener() -> None:
+    # Flush any queued log records before the process exits
+    _log_listener.stop()
+
 class ContentRequest(BaseModel):
     content: str
     use_portia: bool = True  # Default to using Portia pipeline
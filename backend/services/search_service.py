@@ -5,6 +5,7 @@ import google.generativeai as genai
 from ..tools import TavilySearchTool
 from ..agents import QuestionGeneratorAgent
 from ..utils import tavily_limiter, gemini_limiter
+from ..utils.genai_client import configure_genai, get_genai_model
 
 class SearchService:
     """Service to handle search functionality using Google's Generative AI and Tavily"""
@@ -19,7 +20,7 @@ class SearchService:
         """Initialize Google's Generative AI and Tavily tool"""
         try:
             if "google_api_key" in self.config:
-                genai.configure(api_key=self.config["google_api_key"])
+                configure_genai(self.config["google_api_key"])
                 print("Google Generative AI configured successfully!")
             else:
                 raise ValueError("Google API Key is required for setup.")
@@ -93,7 +94,7 @@ class SearchService:
             if not genai.API_KEY:
                  return "Error: Google Generative AI is not configured for synthesis."
 
-            model = genai.GenerativeModel('gemini-1.5-pro') # Consider making model configurable
+            model = get_genai_model(self.config["google_api_key"], 'gemini-1.5-pro') # Consider making model configurable
 
             # Format the results for the prompt
             formatted_results = "\n\n".join([
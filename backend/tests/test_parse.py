@@ -0,0 +1,19 @@
+"""
+Regression tests for the LLM analysis parser.
+"""
+from backend.agents._parse import _HEADER_RE, parse_analysis
+
+
+def test_long_decoration_lines_are_not_headers():
+    # Runs of '*' or blanks used to backtrack quadratically (3 lines of 8000 '*' took ~17s),
+    # so at this size a regression hangs the test rather than just slowing it down
+    text = "\n".join(["*" * 50000, " " * 50000, "1." + " *" * 25000])
+    assert _HEADER_RE.search(text) is None
+    analysis = parse_analysis(text, "Is X true?")
+    assert analysis["verification_status"] == "Unknown"
+    assert analysis["supporting_evidence"] == []
+
+
+def test_numbered_bold_header_still_matches():
+    analysis = parse_analysis("1. **Verification Status:** Verified\n5. Reasoning: because", "Is X true?")
+    assert analysis["verification_status"] == "Verified"
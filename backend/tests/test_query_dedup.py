@@ -0,0 +1,13 @@
+"""
+Tests for the search-query key used to share searches within a batch.
+"""
+from backend.agents.fact_checking_agent import _canonical_query
+
+
+def test_different_question_words_stay_separate():
+    questions = ["Who founded X?", "When was X founded?", "Where was X founded?", "Was X founded in 1998?"]
+    assert len({_canonical_query(q) for q in questions}) == len(questions)
+
+
+def test_case_whitespace_and_punctuation_are_normalised():
+    assert _canonical_query("  Who founded X? ") == _canonical_query("who  founded x")
@@ -1,5 +1,6 @@
 import requests
 import logging
+import orjson
 from pydantic import BaseModel, Field
 from ..utils import tavily_limiter
 
@@ -70,10 +71,11 @@ class TavilySearchTool:
         }
         
         logger.info(f"Sending request to Tavily API for '{search_query[:30]}...'")
-        response = requests.post(url, json=payload, headers=headers)
+        # orjson serialises the body and parses the raw response bytes faster than stdlib json
+        response = requests.post(url, data=orjson.dumps(payload), headers=headers)
         logger.info(f"Received response from Tavily API for '{search_query[:30]}...' with status {response.status_code}")
         response.raise_for_status()
-        result = self._format_results(search_query, response.json())
+        result = self._format_results(search_query, orjson.loads(response.content))
         logger.info(f"Formatted results for '{search_query[:30]}...'")
         return result
     
@@ -1,8 +1,8 @@
-import google.generativeai as genai
 from typing import Dict, Any, List
 import yaml
 import os
 from ..utils.personality_loader import PersonalityLoader
+from ..utils.genai_client import get_genai_model
 
 class PersonalityTuner:
     """Class to fine-tune model responses based on agent personalities"""
@@ -14,8 +14,7 @@ class PersonalityTuner:
         
     def _configure_gemini(self):
         """Configure the Gemini model"""
-        genai.configure(api_key=self.config["google_api_key"])
-        self.model = genai.GenerativeModel('gemini-1.5-pro')
+        self.model = get_genai_model(self.config["google_api_key"], 'gemini-1.5-pro')
     
     def generate_training_examples(self, personality: Dict[str, Any]) -> List[Dict[str, str]]:
         """Generate training examples based on personality traits"""
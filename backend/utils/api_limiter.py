@@ -256,5 +256,36 @@ class APILimiter:
                 logger.error(f"===== {self.name} API CALL END (WITH ERROR) =====")
                 raise
 
+class ConcurrencyGate:
+    """
+    Async context manager that caps in-flight calls to an API and spaces out their
+    start times. Unlike APILimiter's delay check, start slots are reserved up front,
+    so many coroutines arriving at once can't all pass at the same moment.
+    Bound to the event loop it is first used on.
+    """
+    def __init__(self, name: str, max_concurrent: int = 8, rps: Optional[float] = None):
+        self.name = name
+        self.min_interval = 1.0 / rps if rps else 0.0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._next_start = 0.0
+
+    async def __aenter__(self) -> "ConcurrencyGate":
+        await self._semaphore.acquire()
+        if self.min_interval:
+            # Reserve the next start slot; no await between reading and updating it
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.min_interval
+            if start > now:
+                try:
+                    await asyncio.sleep(start - now)
+                except BaseException:
+                    self._semaphore.release()
+                    raise
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._semaphore.release()
+
 # Create a global instance to share across the application
 gemini_limiter = APILimiter(name="gemini", base_delay=10.0, max_retries=5, max_backoff=120.0) 
\ No newline at end of file
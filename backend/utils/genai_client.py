@@ -0,0 +1,37 @@
+"""
+Shared Google Generative AI client setup.
+genai.configure() throws away the SDK's cached clients, so calling it from every
+agent tears down the gRPC (HTTP/2) channel and forces a fresh TLS handshake on
+the next request. Configuring once per API key and reusing the same model
+objects lets concurrent calls multiplex over a single long-lived channel.
+"""
+import threading
+from typing import Dict, Optional, Tuple
+
+import google.generativeai as genai
+
+_lock = threading.Lock()
+_configured_key: Optional[str] = None
+_models: Dict[Tuple[str, str], genai.GenerativeModel] = {}
+
+
+def configure_genai(api_key: str) -> None:
+    """Configure the SDK for this API key unless it already is"""
+    global _configured_key
+    with _lock:
+        if _configured_key != api_key:
+            # gRPC is the SDK's default transport; it keeps one multiplexed HTTP/2 channel
+            genai.configure(api_key=api_key)
+            _configured_key = api_key
+            _models.clear()  # Models bound to the previous key's clients
+
+
+def get_genai_model(api_key: str, model_name: str = 'gemini-1.5-pro') -> genai.GenerativeModel:
+    """Return a shared GenerativeModel for the given API key and model name"""
+    configure_genai(api_key)
+    with _lock:
+        model = _models.get((api_key, model_name))
+        if model is None:
+            model = genai.GenerativeModel(model_name)
+            _models[(api_key, model_name)] = model
+        return model